@@ -0,0 +1,72 @@
+"""Drop-in stand-in for ``exa_py.Exa`` that never touches the network.
+
+``FakeExa.search_and_contents`` accepts the same keyword arguments the search
+tools pass, sleeps for a configurable latency and jitter (the real SDK is
+synchronous, so this blocks the calling worker thread just like it), and
+returns deterministic results shaped like the SDK's. A share of results are
+syndicated copies of another result under a different URL, so
+near-duplicate merging has something to do.
+
+    search = search_server.SearchTools()
+    search.exa = FakeExa(latency=800, jitter=300)
+"""
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+WORDS = ("analysis market policy research data growth model network energy "
+         "climate security report study results impact industry technology "
+         "regulation investment performance design system users").split()
+DOMAINS = ("example.com", "news.example.org", "blog.example.net",
+           "journal.example.edu", "wire.example.com")
+
+
+class FakeExa:
+
+    def __init__(self, latency: float = 500.0, jitter: float = 200.0,
+                 duplicate_rate: float = 0.2, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.duplicate_rate = duplicate_rate
+        self.error_rate = error_rate
+        self.calls = 0
+
+    def search_and_contents(self, query: str, num_results: int = 10,
+                            **kwargs: Any) -> SimpleNamespace:
+        self.calls += 1
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, delay) / 1000)
+        if random.random() < self.error_rate:
+            raise RuntimeError("Fake Exa error")
+
+        seed = hashlib.blake2b(query.encode(), digest_size=8).digest()
+        rng = random.Random(int.from_bytes(seed, "big"))
+        now = datetime.now(timezone.utc)
+        results = []
+        for i in range(num_results):
+            if results and rng.random() < self.duplicate_rate:
+                original = rng.choice(results)
+                results.append(
+                    SimpleNamespace(
+                        title=original.title,
+                        url=f"https://{rng.choice(DOMAINS)}/syndicated/"
+                        f"{rng.getrandbits(32):08x}",
+                        published_date=original.published_date,
+                        summary=original.summary))
+                continue
+            published = now - timedelta(days=rng.randint(0, 700))
+            title = " ".join(rng.choice(WORDS) for _ in range(6)).title()
+            summary = " ".join(
+                rng.choice(WORDS) for _ in range(rng.randint(60, 180)))
+            results.append(
+                SimpleNamespace(
+                    title=title,
+                    url=f"https://{rng.choice(DOMAINS)}/{i}/"
+                    f"{rng.getrandbits(32):08x}",
+                    published_date=published.strftime(
+                        "%Y-%m-%dT%H:%M:%S.000Z"),
+                    summary=summary.capitalize() + "."))
+        return SimpleNamespace(results=results)
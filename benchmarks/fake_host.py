@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""mcp_host.py wired to offline upstreams, for load tests.
+
+Serves the same tools as mcp_host.py, but the weather tools call the NWS
+base URL in FAKE_NWS_URL (see fake_nws.py) and the search tools use a
+FakeExa client. FAKE_EXA_LATENCY, FAKE_EXA_JITTER and FAKE_EXA_ERROR_RATE
+(milliseconds / fraction) shape the fake Exa's responses.
+"""
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import search_server  # noqa: E402
+import weather_server  # noqa: E402
+from benchmarks.fake_exa import FakeExa  # noqa: E402
+from mcp_common import MCPHost, ToolRegistry, serve  # noqa: E402
+
+
+def build_registry() -> ToolRegistry:
+    weather_server.WeatherTools.NWS_API_BASE = os.getenv(
+        "FAKE_NWS_URL", "http://127.0.0.1:8765")
+    registry = ToolRegistry()
+    weather_server.register_tools(registry)
+
+    os.environ.setdefault("EXA_API_KEY", "benchmark")
+    search = search_server.SearchTools()
+    search.exa = FakeExa(
+        latency=float(os.getenv("FAKE_EXA_LATENCY", "500")),
+        jitter=float(os.getenv("FAKE_EXA_JITTER", "200")),
+        error_rate=float(os.getenv("FAKE_EXA_ERROR_RATE", "0")))
+    search_server.register_tools(registry, search)
+    return registry
+
+
+async def main():
+    await serve(MCPHost(build_registry(), "beebot-tools-fake"))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
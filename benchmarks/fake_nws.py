@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Local stand-in for api.weather.gov.
+
+Serves /points, /gridpoints/.../forecast (and /forecast/hourly and raw
+gridpoint data) and /alerts with plausible, deterministic payloads, after a
+configurable latency and jitter. Responses carry ETag and Cache-Control like
+the real API, and conditional requests get 304s.
+
+    python3 benchmarks/fake_nws.py --port 8765 --latency 80 --jitter 40
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Grid cells are 1/40 degree, roughly the 2.5 km NWS grid.
+CELLS_PER_DEGREE = 40
+STATES = ("AL AK AZ AR CA CO CT DE DC FL GA HI ID IL IN IA KS KY LA ME MD MA "
+          "MI MN MS MO MT NE NV NH NJ NM NY NC ND OH OK OR PA RI SC SD TN TX "
+          "UT VT VA WA WV WI WY").split()
+EVENTS = ("Heat Advisory", "Wind Advisory", "Flood Watch", "Winter Storm Warning",
+          "Red Flag Warning", "Dense Fog Advisory", "Small Craft Advisory")
+WORDS = ("strong gusty winds heavy rain snow travel hazardous conditions expected "
+         "through the evening with visibility below one mile in spots and "
+         "temperatures near record levels across the region").split()
+
+
+def _rng(*parts) -> random.Random:
+    seed = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return random.Random(int.from_bytes(seed, "big"))
+
+
+def _prose(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _cell(lat: float, lon: float) -> tuple[int, int]:
+    return (int((lon + 180) * CELLS_PER_DEGREE),
+            int((lat + 90) * CELLS_PER_DEGREE))
+
+
+def _cell_polygon(x: int, y: int) -> list:
+    lon0, lat0 = x / CELLS_PER_DEGREE - 180, y / CELLS_PER_DEGREE - 90
+    lon1, lat1 = lon0 + 1 / CELLS_PER_DEGREE, lat0 + 1 / CELLS_PER_DEGREE
+    return [[[lon0, lat0], [lon1, lat0], [lon1, lat1], [lon0, lat1],
+             [lon0, lat0]]]
+
+
+def points(base: str, lat: float, lon: float) -> dict:
+    x, y = _cell(lat, lon)
+    grid = f"{base}/gridpoints/FAK/{x},{y}"
+    return {
+        "properties": {
+            "gridId": "FAK",
+            "gridX": x,
+            "gridY": y,
+            "forecast": f"{grid}/forecast",
+            "forecastHourly": f"{grid}/forecast/hourly",
+            "forecastGridData": grid
+        }
+    }
+
+
+def forecast(x: int, y: int) -> dict:
+    rng = _rng("forecast", x, y)
+    names = ["Tonight", "Saturday", "Saturday Night", "Sunday",
+             "Sunday Night", "Monday", "Monday Night", "Tuesday",
+             "Tuesday Night", "Wednesday", "Wednesday Night", "Thursday",
+             "Thursday Night", "Friday"]
+    periods = [{
+        "number": i + 1,
+        "name": name,
+        "temperature": rng.randint(20, 95),
+        "temperatureUnit": "F",
+        "windSpeed": f"{rng.randint(0, 15)} to {rng.randint(15, 30)} mph",
+        "windDirection": rng.choice(["N", "NE", "E", "SE", "S", "SW", "W",
+                                     "NW"]),
+        "detailedForecast": _prose(rng, rng.randint(20, 45))
+    } for i, name in enumerate(names)]
+    return {
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": _cell_polygon(x, y)
+        },
+        "properties": {
+            "periods": periods
+        }
+    }
+
+
+def _hours_from_now(count: int) -> list[datetime]:
+    start = datetime.now(timezone.utc).replace(minute=0, second=0,
+                                               microsecond=0)
+    return [start + timedelta(hours=h) for h in range(count)]
+
+
+def forecast_hourly(x: int, y: int) -> dict:
+    rng = _rng("hourly", x, y)
+    return {
+        "properties": {
+            "periods": [{
+                "startTime": hour.isoformat(),
+                "temperature": rng.randint(30, 90),
+                "temperatureUnit": "F",
+                "probabilityOfPrecipitation": {
+                    "value": rng.choice([0, 0, 10, 20, 40, 70])
+                },
+                "windSpeed": f"{rng.randint(0, 25)} mph"
+            } for hour in _hours_from_now(156)]
+        }
+    }
+
+
+def gridpoint(x: int, y: int) -> dict:
+    rng = _rng("grid", x, y)
+    hours = _hours_from_now(168)
+
+    def layer(uom, low, high, step=1):
+        return {
+            "uom": uom,
+            "values": [{
+                "validTime": f"{hours[i].isoformat()}/PT{step}H",
+                "value": round(rng.uniform(low, high), 1)
+            } for i in range(0, len(hours), step)]
+        }
+
+    return {
+        "properties": {
+            "temperature": layer("wmoUnit:degC", -5, 35),
+            "probabilityOfPrecipitation": layer("wmoUnit:percent", 0, 100, 6),
+            "windSpeed": layer("wmoUnit:km_h-1", 0, 40),
+            "windGust": layer("wmoUnit:km_h-1", 0, 70, 3),
+            "quantitativePrecipitation": layer("wmoUnit:mm", 0, 5, 6)
+        }
+    }
+
+
+def alerts(states: list[str]) -> dict:
+    features = []
+    for state in states:
+        rng = _rng("alerts", state)
+        for i in range(rng.randint(0, 6)):
+            # Some alerts also cover the next state over.
+            other = STATES[(STATES.index(state) + 1) % len(STATES)] if (
+                state in STATES and rng.random() < 0.3) else state
+            features.append({
+                "id": f"urn:fake:{state}:{i}",
+                "properties": {
+                    "id": f"urn:fake:{state}:{i}",
+                    "event": rng.choice(EVENTS),
+                    "areaDesc": f"{state} zone {i}",
+                    "severity": rng.choice(["Minor", "Moderate", "Severe"]),
+                    "description": _prose(rng, rng.randint(60, 300)),
+                    "instruction": _prose(rng, rng.randint(10, 60)),
+                    "geocode": {
+                        "UGC": [f"{state}Z{i:03d}", f"{other}Z{i + 100:03d}"]
+                    }
+                }
+            })
+    return {"features": features}
+
+
+class FakeNWSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeNWS/1.0"
+
+    def do_GET(self):
+        config = self.server.config
+        delay = config.latency + random.uniform(-config.jitter, config.jitter)
+        time.sleep(max(0.0, delay) / 1000)
+        if random.random() < config.error_rate:
+            return self._send(503, b'{"title":"Service Unavailable"}')
+
+        try:
+            body = self._route(urlsplit(self.path))
+        except (ValueError, IndexError):
+            body = None
+        if body is None:
+            return self._send(404, b'{"title":"Not Found"}')
+
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        etag = '"' + hashlib.blake2b(payload, digest_size=8).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", etag)
+        self._send(200, payload, etag)
+
+    def _route(self, url):
+        base = f"http://{self.headers.get('Host')}"
+        path = url.path.rstrip("/")
+        if match := re.fullmatch(r"/points/(-?[\d.]+),(-?[\d.]+)", path):
+            return points(base, float(match[1]), float(match[2]))
+        if match := re.fullmatch(r"/gridpoints/\w+/(\d+),(\d+)(/forecast(/hourly)?)?",
+                                 path):
+            x, y = int(match[1]), int(match[2])
+            if match[4]:
+                return forecast_hourly(x, y)
+            return forecast(x, y) if match[3] else gridpoint(x, y)
+        if match := re.fullmatch(r"/alerts/active/area/(\w+)", path):
+            return alerts([match[1].upper()])
+        if path == "/alerts/active":
+            area = parse_qs(url.query).get("area", [""])[0]
+            return alerts([s for s in area.upper().split(",") if s])
+        return None
+
+    def _send(self, status: int, payload: bytes, etag: str | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/geo+json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control",
+                         f"public, max-age={self.server.config.max_age}")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up, e.g. a hedged request that lost the race.
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                max_age: int = 60, error_rate: float = 0.0) -> ThreadingHTTPServer:
+    """Create (but do not start) a fake NWS server; port 0 picks a free one."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeNWSHandler)
+    server.daemon_threads = True
+    server.config = argparse.Namespace(latency=latency, jitter=jitter,
+                                       max_age=max_age, error_rate=error_rate)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=50.0,
+                        help="mean response latency in ms")
+    parser.add_argument("--jitter", type=float, default=20.0,
+                        help="uniform +/- jitter in ms")
+    parser.add_argument("--max-age", type=int, default=60,
+                        help="Cache-Control max-age in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.latency, args.jitter, args.max_age,
+                         args.error_rate)
+    print(f"Fake NWS listening on http://127.0.0.1:{server.server_port}",
+          file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""Open-loop JSON-RPC load generator for the MCP tool servers.
+
+Starts a fake NWS server and the tool host (fake_host.py by default, so
+nothing leaves the machine), then sends tools/call requests over stdio at a
+target rate for a fixed duration. Requests are sent on schedule whether or
+not earlier ones have returned, so queueing in the server shows up as
+latency instead of silently lowering the offered load. Run from the
+repository root:
+
+    python3 benchmarks/loadgen.py --rate 50 --duration 30
+    python3 benchmarks/loadgen.py --mix get_forecast=3,web_search=1 \\
+        --nws-latency 150 --exa-latency 900
+    python3 benchmarks/loadgen.py --server "python3 weather_server.py" \\
+        --mix get_forecast=1      # any stdio server; upstreams not faked
+
+Prints throughput and p50/p95/p99 latency per tool; --json writes the same
+numbers as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Spread over the contiguous US; drawn from a fixed pool so repeat calls hit
+# the same grid cells the way real traffic does.
+STATES = ["CA", "TX", "FL", "NY", "PA", "IL", "OH", "GA", "NC", "MI", "WA",
+          "AZ", "CO", "MN", "OR"]
+CITIES = ["New York", "Chicago", "Denver", "Seattle", "Miami", "Boston",
+          "Phoenix", "Atlanta"]
+TOPICS = ["solid state batteries", "grid scale storage", "heat pump adoption",
+          "small modular reactors", "urban flood forecasting",
+          "wildfire smoke exposure", "carbon capture costs",
+          "offshore wind supply chains"]
+
+DEFAULT_MIX = {
+    "get_forecast": 4,
+    "get_alerts": 2,
+    "get_regional_alerts": 0.5,
+    "get_forecast_batch": 0.5,
+    "get_hourly_forecast": 1,
+    "get_gridpoint_summary": 0.5,
+    "get_weather_by_city": 1,
+    "web_search": 2,
+    "deep_research": 0.5,
+}
+
+
+class Workload:
+    """Draws tool arguments from fixed pools of locations and queries."""
+
+    def __init__(self, rng: random.Random, locations: int):
+        self.rng = rng
+        self.locations = [(round(rng.uniform(30, 47), 4),
+                           round(rng.uniform(-120, -75), 4))
+                          for _ in range(locations)]
+
+    def location(self) -> dict:
+        lat, lon = self.rng.choice(self.locations)
+        return {"latitude": lat, "longitude": lon}
+
+    def arguments(self, tool: str) -> dict:
+        rng = self.rng
+        if tool in ("get_forecast", "get_hourly_forecast",
+                    "get_gridpoint_summary"):
+            return self.location()
+        if tool == "get_forecast_batch":
+            return {"locations": [self.location()
+                                  for _ in range(rng.randint(2, 5))]}
+        if tool == "get_alerts":
+            return {"state": rng.choice(STATES)}
+        if tool == "get_regional_alerts":
+            return {"region": rng.choice(["northeast", "midwest", "south",
+                                          "west"])}
+        if tool == "get_weather_by_city":
+            return {"city": rng.choice(CITIES)}
+        if tool == "web_search":
+            return {"query": f"{rng.choice(TOPICS)} {rng.randint(1, 20)}",
+                    "num_results": rng.randint(3, 10)}
+        if tool == "deep_research":
+            return {"topic": rng.choice(TOPICS)}
+        raise ValueError(f"No argument generator for tool '{tool}'")
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class LoadGenerator:
+    """Drives one stdio server and records per-tool latencies."""
+
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        self.next_id = 0
+        self.pending: dict[int, asyncio.Future] = {}
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.sent: dict[str, int] = defaultdict(int)
+        self.reader = asyncio.create_task(self.read_replies())
+
+    async def read_replies(self) -> None:
+        while line := await self.proc.stdout.readline():
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            future = self.pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        for future in self.pending.values():
+            future.set_exception(EOFError("server exited"))
+
+    async def request(self, method: str, params: dict) -> dict:
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        message = {"jsonrpc": "2.0", "id": self.next_id, "method": method,
+                   "params": params}
+        self.proc.stdin.write((json.dumps(message) + "\n").encode())
+        await self.proc.stdin.drain()
+        return await future
+
+    async def call(self, tool: str, arguments: dict, timeout: float) -> None:
+        self.sent[tool] += 1
+        start = time.perf_counter()
+        try:
+            reply = await asyncio.wait_for(
+                self.request("tools/call", {"name": tool,
+                                            "arguments": arguments}), timeout)
+        except (asyncio.TimeoutError, EOFError):
+            self.errors[tool] += 1
+            return
+        elapsed = time.perf_counter() - start
+        result = reply.get("result") or {}
+        if "error" in reply or "error" in result or result.get("isError"):
+            self.errors[tool] += 1
+        else:
+            self.latencies[tool].append(elapsed)
+
+    async def run(self, mix: dict[str, float], workload: Workload, rate: float,
+                  duration: float, poisson: bool, timeout: float) -> float:
+        """Send calls at ``rate`` per second; returns the wall time taken."""
+        tools, weights = list(mix), list(mix.values())
+        rng = workload.rng
+        calls = []
+        start = time.perf_counter()
+        next_send = start
+        while next_send - start < duration:
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tool = rng.choices(tools, weights)[0]
+            calls.append(asyncio.create_task(
+                self.call(tool, workload.arguments(tool), timeout)))
+            next_send += rng.expovariate(rate) if poisson else 1 / rate
+        await asyncio.gather(*calls)
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> dict:
+        rows = {}
+        for tool in sorted(self.sent):
+            samples = [s * 1000 for s in self.latencies[tool]]
+            row = {"sent": self.sent[tool], "ok": len(samples),
+                   "errors": self.errors[tool],
+                   "throughput": len(samples) / elapsed}
+            if samples:
+                row.update(p50=percentile(samples, 50),
+                           p95=percentile(samples, 95),
+                           p99=percentile(samples, 99), max=max(samples))
+            rows[tool] = row
+        return rows
+
+
+def print_report(rows: dict, elapsed: float) -> None:
+    print(f"{'tool':<22} {'sent':>6} {'ok':>6} {'err':>5} {'req/s':>7} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for tool, row in rows.items():
+        line = (f"{tool:<22} {row['sent']:6d} {row['ok']:6d} "
+                f"{row['errors']:5d} {row['throughput']:7.1f}")
+        if row["ok"]:
+            line += (f" {row['p50']:8.1f} {row['p95']:8.1f} {row['p99']:8.1f} "
+                     f"{row['max']:8.1f}")
+        print(line)
+    total = sum(row["ok"] for row in rows.values())
+    print(f"\n{total} calls completed in {elapsed:.1f}s "
+          f"({total / elapsed:.1f} req/s)")
+
+
+async def run(args) -> None:
+    env = dict(os.environ)
+    # Points resolved against the fake NWS must never reach the user's real
+    # points cache, even when NWS_POINTS_CACHE_PATH or XDG_CACHE_HOME is set.
+    cache_dir = tempfile.TemporaryDirectory(prefix="beebot-bench-")
+    env["NWS_POINTS_CACHE_PATH"] = os.path.join(cache_dir.name,
+                                                "nws_points.json")
+    env.setdefault("FAKE_EXA_LATENCY", str(args.exa_latency))
+    env.setdefault("FAKE_EXA_JITTER", str(args.exa_jitter))
+
+    nws = None
+    if not args.no_fake_nws:
+        port = free_port()
+        env["FAKE_NWS_URL"] = f"http://127.0.0.1:{port}"
+        nws = subprocess.Popen(
+            [sys.executable, os.path.join(HERE, "fake_nws.py"), "--port",
+             str(port), "--latency", str(args.nws_latency), "--jitter",
+             str(args.nws_jitter), "--max-age", str(args.nws_max_age),
+             "--error-rate", str(args.nws_error_rate)],
+            stderr=subprocess.DEVNULL)
+        await asyncio.sleep(0.3)
+
+    command = shlex.split(args.server) if args.server else [
+        sys.executable, os.path.join(HERE, "fake_host.py")]
+    proc = await asyncio.create_subprocess_exec(
+        *command, cwd=ROOT, env=env, stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=None if args.verbose else asyncio.subprocess.DEVNULL,
+        limit=16 * 1024 * 1024)
+    try:
+        load = LoadGenerator(proc)
+        await load.request("initialize", {})
+        listed = await load.request("tools/list", {})
+        available = {tool["name"] for tool in listed["result"]["tools"]}
+        mix = {tool: weight for tool, weight in parse_mix(args.mix).items()
+               if weight > 0}
+        missing = set(mix) - available
+        if missing:
+            print(f"Server lacks tools: {', '.join(sorted(missing))}",
+                  file=sys.stderr)
+            mix = {tool: w for tool, w in mix.items() if tool in available}
+        if not mix:
+            raise SystemExit("Nothing to call")
+
+        elapsed = await load.run(mix, Workload(random.Random(args.seed),
+                                               args.locations), args.rate,
+                                 args.duration, not args.uniform,
+                                 args.timeout)
+        rows = load.report(elapsed)
+        if args.json:
+            print(json.dumps({"elapsed": elapsed, "rate": args.rate,
+                              "tools": rows}, indent=2))
+        else:
+            print_report(rows, elapsed)
+    finally:
+        proc.stdin.close()
+        try:
+            await asyncio.wait_for(proc.wait(), 10)
+        except asyncio.TimeoutError:
+            proc.kill()
+        if nws is not None:
+            nws.terminate()
+            nws.wait()
+        cache_dir.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20.0,
+                        help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds to keep sending")
+    parser.add_argument("--mix", default="",
+                        help="tool=weight,... (default: all tools)")
+    parser.add_argument("--uniform", action="store_true",
+                        help="evenly spaced arrivals instead of Poisson")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="per-call timeout in seconds")
+    parser.add_argument("--locations", type=int, default=50,
+                        help="size of the location pool")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--server", default="",
+                        help="server command (default: fake_host.py)")
+    parser.add_argument("--no-fake-nws", action="store_true",
+                        help="do not start fake_nws.py")
+    parser.add_argument("--nws-latency", type=float, default=50.0)
+    parser.add_argument("--nws-jitter", type=float, default=20.0)
+    parser.add_argument("--nws-max-age", type=int, default=60)
+    parser.add_argument("--nws-error-rate", type=float, default=0.0,
+                        help="fraction of NWS requests answered with 503")
+    parser.add_argument("--exa-latency", type=float, default=500.0)
+    parser.add_argument("--exa-jitter", type=float, default=200.0)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--verbose", action="store_true",
+                        help="pass the server's stderr through")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Measure MCP server cold start: spawn to first tools/list reply.
+
+Each run starts a fresh interpreter, sends initialize and tools/list, and
+times how long the tools/list reply takes to arrive. Run from the repository
+root:
+
+    python3 benchmarks/startup.py                  # all three servers
+    python3 benchmarks/startup.py mcp_host.py --runs 20
+    python3 benchmarks/startup.py --preload httpx,exa_py   # eager baseline
+
+``--preload`` imports the given modules before the server starts, which
+approximates the old eager imports for comparison.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SERVERS = ["mcp_host.py", "weather_server.py", "search_server.py"]
+
+REQUESTS = [
+    {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+    {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}},
+]
+
+
+def server_command(script: str, preload: list[str]) -> list[str]:
+    if not preload:
+        return [sys.executable, script]
+    code = "".join(f"import {module}\n" for module in preload)
+    code += f"import runpy\nrunpy.run_path({script!r}, run_name='__main__')\n"
+    return [sys.executable, "-c", code]
+
+
+def time_to_tools_list(command: list[str], env: dict) -> float:
+    """Seconds from spawning ``command`` until its tools/list reply."""
+    payload = "".join(json.dumps(r) + "\n" for r in REQUESTS).encode()
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=ROOT, env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL)
+    try:
+        proc.stdin.write(payload)
+        proc.stdin.close()
+        for line in proc.stdout:
+            if json.loads(line).get("id") == 2:
+                return time.perf_counter() - start
+        raise RuntimeError(f"{command} exited without a tools/list reply")
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("servers", nargs="*", default=DEFAULT_SERVERS)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--preload", default="",
+                        help="comma-separated modules to import up front")
+    parser.add_argument("--warm-up", action="store_true",
+                        help="set MCP_WARM_UP=1 (background preloading)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # The search tools only need a key to start; no request reaches Exa.
+    env.setdefault("EXA_API_KEY", "benchmark")
+    if args.warm_up:
+        env["MCP_WARM_UP"] = "1"
+    preload = [m.strip() for m in args.preload.split(",") if m.strip()]
+
+    print(f"{'server':<20} {'min':>8} {'median':>8} {'p95':>8} {'max':>8}  (ms)")
+    for script in args.servers:
+        command = server_command(script, preload)
+        # One untimed run so the OS file cache is warm for every timed run.
+        time_to_tools_list(command, env)
+        samples = [
+            time_to_tools_list(command, env) * 1000 for _ in range(args.runs)
+        ]
+        print(f"{script:<20} {min(samples):8.1f} "
+              f"{statistics.median(samples):8.1f} "
+              f"{percentile(samples, 95):8.1f} {max(samples):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
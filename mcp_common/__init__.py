@@ -0,0 +1,15 @@
+from .cache import PersistentTTLCache, TTLCache
+from .context import RequestContext, report_progress
+from .dispatch import Dispatcher, RPCError, serve
+from .metrics import Histogram, Metrics
+from .registry import MCPHost, ToolRegistry
+from .singleflight import SingleFlight, call_key, coalesce
+from .tracing import Span, Tracer
+from .transport import MessageTooLarge, StdioTransport
+
+__all__ = [
+    "Dispatcher", "Histogram", "MCPHost", "MessageTooLarge", "Metrics",
+    "PersistentTTLCache", "RPCError", "RequestContext", "SingleFlight",
+    "Span", "StdioTransport", "TTLCache", "ToolRegistry", "Tracer",
+    "call_key", "coalesce", "report_progress", "serve"
+]
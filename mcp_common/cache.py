@@ -0,0 +1,144 @@
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a TTL.
+
+    Bounded by entry count and, when ``max_bytes`` is set, by the total of
+    ``sizeof(value)`` over all entries. Expiry times are wall-clock
+    timestamps so entries can be persisted and reloaded across restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0,
+                 max_bytes: int | None = None,
+                 sizeof: Callable[[Any], int] | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._insert(key, expires_at, value)
+        self._evict()
+
+    def _insert(self, key: Hashable, expires_at: float, value: Any) -> None:
+        if key in self._data:
+            self._remove(key)
+        size = self.sizeof(value)
+        self._data[key] = (expires_at, value)
+        self._sizes[key] = size
+        self.total_bytes += size
+
+    def _remove(self, key: Hashable) -> tuple[float, Any]:
+        entry = self._data.pop(key)
+        self.total_bytes -= self._sizes.pop(key)
+        return entry
+
+    def _evict(self) -> None:
+        while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._data
+                and self.total_bytes > self.max_bytes):
+            self._remove(next(iter(self._data)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._data:
+            return default
+        return self._remove(key)[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._sizes.clear()
+        self.total_bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.time()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PersistentTTLCache(TTLCache):
+    """TTLCache backed by a JSON file so entries survive restarts.
+
+    Keys must be strings. Writes are atomic (temp file + rename) and are
+    batched: a change is written at most every ``save_interval`` seconds and
+    on ``save()``.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1024,
+                 ttl: float = 300.0, save_interval: float = 30.0):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        self.path = path
+        self.save_interval = save_interval
+        self._dirty = False
+        self._last_save = 0.0
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        # Stored oldest-first, so replaying keeps the LRU order.
+        for key, expires_at, value in entries:
+            if expires_at > now:
+                self._insert(key, expires_at, value)
+        self._evict()
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        super().set(key, value, ttl)
+        self._dirty = True
+        if time.time() - self._last_save >= self.save_interval:
+            self.save()
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        if key in self._data:
+            self._dirty = True
+        return super().pop(key, default)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        now = time.time()
+        entries = [[key, expires_at, value]
+                   for key, (expires_at, value) in self._data.items()
+                   if expires_at > now]
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The cache is an optimization; a read-only disk must not break
+            # the server.
+            return
+        self._dirty = False
+        self._last_save = now
@@ -0,0 +1,60 @@
+import contextvars
+from typing import Any, Awaitable, Callable, Dict
+
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class RequestContext:
+    """Per-request state visible to the code handling a JSON-RPC request.
+
+    The dispatcher sets it before calling ``handle_request``, so tool code can
+    talk back to the client (e.g. report progress) without threading the
+    transport through every call.
+    """
+
+    def __init__(self, request: Dict[str, Any], send: Send):
+        if not isinstance(request, dict):
+            request = {}
+        params = request.get("params")
+        meta = params.get("_meta") if isinstance(params, dict) else None
+        self.request_id = request.get("id")
+        self.progress_token = (meta or {}).get("progressToken")
+        self.send = send
+
+    async def report_progress(self, progress: float,
+                              total: float | None = None,
+                              message: str | None = None) -> None:
+        """Send ``notifications/progress`` if the client asked for it."""
+        if self.progress_token is None:
+            return
+        params: Dict[str, Any] = {
+            "progressToken": self.progress_token,
+            "progress": progress
+        }
+        if total is not None:
+            params["total"] = total
+        if message is not None:
+            params["message"] = message
+        await self.send({
+            "jsonrpc": "2.0",
+            "method": "notifications/progress",
+            "params": params
+        })
+
+
+current_request: contextvars.ContextVar[RequestContext | None] = (
+    contextvars.ContextVar("current_request", default=None))
+
+
+async def report_progress(progress: float, total: float | None = None,
+                          message: str | None = None) -> None:
+    """Report progress for the request being handled, if any."""
+    context = current_request.get()
+    if context is not None:
+        await context.report_progress(progress, total, message)
+
+
+def progress_requested() -> bool:
+    """Whether the client asked for progress on the current request."""
+    context = current_request.get()
+    return context is not None and context.progress_token is not None
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from .context import RequestContext, current_request
+from .metrics import metrics as default_metrics
+from .tracing import Span, current_span, parse_trace_context, tracer
+from .transport import MessageTooLarge, StdioTransport
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_QUEUED = 256
+# JSON-RPC 2.0 error codes.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+# JSON-RPC error code for a request whose deadline passed (as in the MCP SDKs).
+REQUEST_TIMEOUT = -32001
+
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class RPCError(Exception):
+    """Raised by a handler to reply with a JSON-RPC error of its choosing."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class Dispatcher:
+    """Run each JSON-RPC request as its own task and reply as soon as it finishes.
+
+    Replies are matched to requests by ``id``, so they may go out in a different
+    order than the requests came in. Notifications (messages without an
+    ``id``) never get a reply. ``max_concurrency`` caps how many requests
+    run at once; with a cap of 1 requests are handled strictly one at a time.
+    Requests beyond the cap wait for a slot in their own task, so input keeps
+    being read (and cancellations seen) while the server is full; once
+    ``max_queued`` are waiting, further requests get an error straight away.
+
+    Each request gets a server span (continuing the trace in
+    ``params._meta``, if any) with child spans for parsing, waiting for a
+    slot and dispatch.
+
+    A request is cancelled, along with everything it is awaiting, when a
+    ``notifications/cancelled`` names its id (no reply is sent), or when the
+    deadline in its ``params._meta`` passes: ``timeoutMs`` from when it was
+    read, or ``deadline`` as a Unix time in milliseconds (a -32001 error is
+    sent).
+    """
+
+    def __init__(self, server, send: Send, max_concurrency: int | None = None,
+                 max_queued: int | None = None):
+        if max_concurrency is None:
+            max_concurrency = int(
+                os.getenv("MCP_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        if max_queued is None:
+            max_queued = int(os.getenv("MCP_MAX_QUEUED", DEFAULT_MAX_QUEUED))
+        self.server = server
+        self.send = send
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queued = max(0, max_queued)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._tasks: set[asyncio.Task] = set()
+        self._running: Dict[Any, asyncio.Task] = {}
+        # Tasks whose request has reached the server's handler.
+        self._handling: set[asyncio.Task] = set()
+        self.metrics = getattr(server, "metrics", default_metrics)
+
+    async def submit(self, line: bytes | str) -> None:
+        """Parse a request line and start handling it.
+
+        Never waits for a free slot: the request's task does that, so the
+        caller can go straight back to reading input.
+        """
+        received = time.time_ns()
+        try:
+            request = json.loads(line)
+        except Exception as e:
+            await self.send({
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": PARSE_ERROR, "message": str(e)}
+            })
+            return
+        parsed = time.time_ns()
+
+        if not isinstance(request, dict):
+            await self.send({
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": INVALID_REQUEST,
+                          "message": "Request must be a JSON object"}
+            })
+            return
+        if "id" not in request:
+            # Only cancellation needs acting on; other notifications, such
+            # as notifications/initialized, carry nothing the host uses.
+            if request.get("method") == "notifications/cancelled":
+                params = request.get("params") or {}
+                self.cancel(params.get("requestId"), params.get("reason"))
+            return
+
+        read_at = asyncio.get_running_loop().time()
+        deadline = self._deadline(request)
+        span = self._request_span(request, received)
+        tracer.record(span, "mcp.parse", received, parsed,
+                      {"message.bytes": len(line)})
+        if len(self._tasks) >= self.max_concurrency + self.max_queued:
+            self.metrics.inc("requests_rejected_total",
+                             method=request.get("method"))
+            await self.send(self._error(request.get("id"), SERVER_ERROR,
+                                        "Server busy", span))
+            tracer.finish(span)
+            return
+        task = asyncio.create_task(self._run(request, span, parsed, deadline))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        # Cancellation is accounted for here rather than in _run, which a
+        # task cancelled before it first runs never enters.
+        task.add_done_callback(
+            lambda task: self._finished(task, request, span, read_at))
+
+        request_id = request.get("id")
+        if isinstance(request_id, (str, int)):
+            self._running[request_id] = task
+            task.add_done_callback(
+                lambda _: self._running.pop(request_id, None))
+
+    def cancel(self, request_id: Any, reason: str | None = None) -> bool:
+        """Cancel the request with this id, if it is still waiting or running."""
+        task = (self._running.get(request_id)
+                if isinstance(request_id, (str, int)) else None)
+        if task is None or task.done():
+            return False
+        task.cancel(reason or "cancelled by client")
+        return True
+
+    @staticmethod
+    def _deadline(request: Dict[str, Any]) -> float | None:
+        """The request's deadline on the event loop clock, if it has one."""
+        params = request.get("params")
+        meta = params.get("_meta") if isinstance(params, dict) else None
+        if not isinstance(meta, dict):
+            return None
+        now = asyncio.get_running_loop().time()
+        timeout_ms = meta.get("timeoutMs")
+        if isinstance(timeout_ms, (int, float)) and timeout_ms > 0:
+            return now + timeout_ms / 1000
+        deadline_ms = meta.get("deadline")
+        if isinstance(deadline_ms, (int, float)):
+            return now + deadline_ms / 1000 - time.time()
+        return None
+
+    @staticmethod
+    def _request_span(request: Dict[str, Any], start_ns: int) -> Span:
+        params = request.get("params")
+        method = str(request.get("method"))
+        return tracer.start_span(
+            method, "server",
+            parse_trace_context(
+                params.get("_meta") if isinstance(params, dict) else None),
+            {"rpc.system": "jsonrpc", "rpc.method": method,
+             "rpc.jsonrpc.request_id": str(request.get("id"))},
+            start_ns)
+
+    async def _handle(self, request: Dict[str, Any], span: Span,
+                      queued_ns: int) -> Any:
+        async with self._slots:
+            tracer.record(span, "mcp.queue", queued_ns, time.time_ns())
+            with tracer.span("mcp.dispatch"):
+                self._handling.add(asyncio.current_task())
+                return await self.server.handle_request(request)
+
+    async def _run(self, request: Dict[str, Any], span: Span, queued_ns: int,
+                   deadline: float | None = None) -> None:
+        request_id = request.get("id")
+        current_request.set(RequestContext(request, self.send))
+        current_span.set(span)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            # The deadline covers the wait for a slot as well as the work.
+            async with asyncio.timeout_at(deadline):
+                result = await self._handle(request, span, queued_ns)
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except asyncio.TimeoutError as e:
+            if deadline is None or loop.time() < deadline:
+                response = self._error(request_id, SERVER_ERROR, str(e), span)
+            else:
+                self._count_cancelled(request, "deadline",
+                                      loop.time() - started)
+                response = self._error(request_id, REQUEST_TIMEOUT,
+                                       "Request deadline exceeded", span)
+        except RPCError as e:
+            response = self._error(request_id, e.code, e.message, span)
+        except Exception as e:
+            response = self._error(request_id, SERVER_ERROR, str(e), span)
+        await self.send(response)
+        tracer.finish(span)
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str,
+               span: Span) -> Dict[str, Any]:
+        span.set_error(message)
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {"code": code, "message": message}
+        }
+
+    def _finished(self, task: asyncio.Task, request: Dict[str, Any],
+                  span: Span, read_at: float) -> None:
+        """Count a request the client cancelled and finish its span."""
+        handled = task in self._handling
+        self._handling.discard(task)
+        if not task.cancelled():
+            return
+        self._count_cancelled(request, "client",
+                              asyncio.get_running_loop().time() - read_at)
+        if not handled and request.get("method") == "tools/call":
+            # The handler, which counts tool calls, never saw this one.
+            params = request.get("params")
+            self.metrics.inc(
+                "tool_calls_total", status="cancelled",
+                tool=params.get("name") if isinstance(params, dict) else None)
+        span.set_error("cancelled")
+        tracer.finish(span)
+
+    def _count_cancelled(self, request: Dict[str, Any], reason: str,
+                         elapsed: float) -> None:
+        """Count a cancelled request and how long since it was read."""
+        params = request.get("params")
+        tool = params.get("name") if isinstance(params, dict) else None
+        labels = {"method": request.get("method"), "reason": reason}
+        if request.get("method") == "tools/call":
+            labels["tool"] = tool
+        self.metrics.inc("requests_cancelled_total", **labels)
+        self.metrics.inc("cancelled_work_seconds_total", elapsed, **labels)
+
+    async def drain(self) -> None:
+        """Wait for every in-flight request to finish."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+async def serve(server, max_concurrency: int | None = None) -> None:
+    """Serve JSON-RPC requests from stdin until EOF, replying on stdout."""
+    transport = await StdioTransport().open()
+    dispatcher = Dispatcher(server, transport.send, max_concurrency)
+
+    try:
+        while True:
+            try:
+                line = await transport.readline()
+            except MessageTooLarge as e:
+                await transport.send({
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {"code": INVALID_REQUEST, "message": str(e)}
+                })
+                continue
+            if line is None:
+                break
+            if not line.strip():
+                continue
+            await dispatcher.submit(line)
+
+        await dispatcher.drain()
+    finally:
+        if hasattr(server, "aclose"):
+            await server.aclose()
+        tracer.flush()
+        await transport.close()
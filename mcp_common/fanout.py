@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import (Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple,
+                    Sequence)
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Reciprocal rank fusion constant; 60 is the value from the original paper
+# and keeps one list's top hit from drowning out agreement between lists.
+RRF_K = 60
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+
+class SubQuery(NamedTuple):
+    name: str
+    params: Dict[str, Any]
+    weight: float = 1.0
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for duplicate detection.
+
+    Scheme and host are lower-cased, ``www.``, fragments, trailing slashes
+    and tracking parameters are dropped.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(
+        sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+               if not k.lower().startswith(_TRACKING_PARAMS)))
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip("/"),
+                       query, ""))
+
+
+async def fan_out(
+    search: Callable[[Dict[str, Any]], Awaitable[Any]],
+    queries: Sequence[SubQuery],
+    budget: int,
+    deadline: float,
+    on_result: Callable[[SubQuery, Any], Awaitable[None]] | None = None
+) -> Dict[str, Any]:
+    """Run up to ``budget`` sub-queries concurrently within ``deadline`` seconds.
+
+    Returns each finished sub-query's result (or the exception it raised) by
+    name. Sub-queries beyond the budget are not sent; ones still running at
+    the deadline are cancelled and left out. ``on_result`` is awaited as each
+    sub-query succeeds, in completion order.
+    """
+    queries = list(queries)[:max(0, budget)]
+    tasks = {
+        asyncio.ensure_future(search(query.params)): query
+        for query in queries
+    }
+    results: Dict[str, Any] = {}
+    stop_at = time.monotonic() + deadline
+    try:
+        pending = set(tasks)
+        while pending:
+            timeout = stop_at - time.monotonic()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                query = tasks[task]
+                if task.exception() is not None:
+                    results[query.name] = task.exception()
+                    continue
+                results[query.name] = task.result()
+                if on_result is not None:
+                    await on_result(query, task.result())
+    finally:
+        for task in tasks:
+            task.cancel()
+    return results
+
+
+def merge_ranked(ranked_lists: Iterable[tuple[float, List[Dict[str, Any]]]],
+                 url_key: str = "url") -> List[Dict[str, Any]]:
+    """Merge ranked result lists into one, best first, without duplicate URLs.
+
+    Each input is ``(weight, items)``. Items are scored by weighted
+    reciprocal rank fusion, so a result several sub-queries agree on beats
+    one that only a single list ranked highly. The first copy of each URL
+    seen is kept.
+    """
+    scores: Dict[str, float] = {}
+    items: Dict[str, Dict[str, Any]] = {}
+    order: Dict[str, int] = {}
+    for weight, ranked in ranked_lists:
+        for rank, item in enumerate(ranked, 1):
+            key = normalize_url(item[url_key])
+            if key not in items:
+                items[key] = item
+                order[key] = len(order)
+            scores[key] = scores.get(key, 0.0) + weight / (RRF_K + rank)
+    return [
+        items[key]
+        for key in sorted(items, key=lambda key: (-scores[key], order[key]))
+    ]
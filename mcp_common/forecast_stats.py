@@ -0,0 +1,182 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+
+# NWS gridpoint layers report SI units; convert to what the forecasts show.
+_UNIT_CONVERSIONS = {
+    "wmoUnit:degC": lambda v: v * 9 / 5 + 32,
+    "wmoUnit:km_h-1": lambda v: v / 1.609344,
+    "wmoUnit:m_s-1": lambda v: v * 2.236936,
+    "wmoUnit:mm": lambda v: v / 25.4,
+}
+
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    """Start index of each run of equal, already-sorted keys."""
+    return np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+
+
+def _nanmean_reduceat(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    present = ~np.isnan(values)
+    totals = np.add.reduceat(np.where(present, values, 0.0), starts)
+    counts = np.add.reduceat(present.astype(float), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return totals / counts
+
+
+def _row(stats: Dict[str, np.ndarray], i: int) -> Dict[str, float]:
+    return {name: round(values[i].item(), 3) for name, values in stats.items()}
+
+
+def summarize_hourly(periods: List[Dict[str, Any]],
+                     days: int = 7) -> List[Dict[str, Any]]:
+    """Aggregate /forecast/hourly periods into per-day statistics.
+
+    Days are the local calendar days of each period's ``startTime``. Returns
+    min/max/mean temperature, the peak and mean hourly probability of
+    precipitation, and peak wind speed for each day. Hourly chances are not
+    combined as independent events, which would overstate the daily chance.
+    """
+    if not periods:
+        return []
+
+    day = np.array([p["startTime"][:10] for p in periods])
+    temp = np.array([p["temperature"] for p in periods], dtype=float)
+    pop = np.array([(p.get("probabilityOfPrecipitation") or {}).get("value")
+                    or 0 for p in periods], dtype=float) / 100
+    wind = np.array([
+        max(map(float, _NUMBER.findall(p.get("windSpeed") or "")), default=0.0)
+        for p in periods
+    ])
+
+    all_starts = _group_starts(day)
+    starts = all_starts[:days]
+    end = all_starts[days] if len(all_starts) > days else len(day)
+    day, temp, pop, wind = day[:end], temp[:end], pop[:end], wind[:end]
+
+    counts = np.diff(np.append(starts, end))
+    dates = day[starts]
+    stats = {
+        "temp_min": np.minimum.reduceat(temp, starts),
+        "temp_max": np.maximum.reduceat(temp, starts),
+        "temp_mean": np.add.reduceat(temp, starts) / counts,
+        "precip_chance_peak": np.maximum.reduceat(pop, starts),
+        "precip_chance_mean": np.add.reduceat(pop, starts) / counts,
+        "wind_peak": np.maximum.reduceat(wind, starts),
+    }
+    unit = periods[0].get("temperatureUnit", "F")
+    return [{
+        "date": str(dates[i]),
+        **_row(stats, i),
+        "temperature_unit": unit
+    } for i in range(len(starts))]
+
+
+def _duration_hours(duration: str) -> int:
+    match = _DURATION.match(duration)
+    if not match:
+        return 1
+    days, hours, minutes = (int(g or 0) for g in match.groups())
+    return max(1, days * 24 + hours + (1 if minutes else 0))
+
+
+def expand_layer(layer: Dict[str, Any], start: datetime, hours: int,
+                 accumulated: bool = False) -> np.ndarray:
+    """Spread a gridpoint layer's ``validTime`` intervals onto an hourly grid.
+
+    Each value covers ``start/duration``; it is repeated over every hour of
+    its interval, or split evenly across them for accumulated quantities
+    such as precipitation amount. Hours with no data are NaN.
+    """
+    values = layer.get("values") or []
+    out = np.full(hours, np.nan)
+    if not values:
+        return out
+
+    offsets = np.empty(len(values), dtype=np.int64)
+    spans = np.empty(len(values), dtype=np.int64)
+    amounts = np.empty(len(values), dtype=float)
+    for i, entry in enumerate(values):
+        begin, _, duration = entry["validTime"].partition("/")
+        offsets[i] = (datetime.fromisoformat(begin) - start) // timedelta(
+            hours=1)
+        spans[i] = _duration_hours(duration)
+        amounts[i] = np.nan if entry["value"] is None else entry["value"]
+
+    convert = _UNIT_CONVERSIONS.get(layer.get("uom"))
+    if convert is not None:
+        amounts = convert(amounts)
+    if accumulated:
+        amounts = amounts / spans
+
+    first_hour = np.repeat(np.cumsum(spans) - spans, spans)
+    index = np.repeat(offsets, spans) + np.arange(spans.sum()) - first_hour
+    per_hour = np.repeat(amounts, spans)
+    keep = (index >= 0) & (index < hours)
+    out[index[keep]] = per_hour[keep]
+    return out
+
+
+def summarize_gridpoints(properties: Dict[str, Any],
+                         days: int = 7) -> List[Dict[str, Any]]:
+    """Aggregate raw /gridpoints series into per-day (UTC) statistics.
+
+    Temperatures are reported in °F, wind in mph and precipitation in
+    inches, like the text forecasts.
+    """
+    temperature = properties.get("temperature") or {}
+    if not temperature.get("values"):
+        return []
+    first = temperature["values"][0]["validTime"].partition("/")[0]
+    start = datetime.fromisoformat(first).astimezone(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0)
+    hours = days * 24
+
+    temp = expand_layer(temperature, start, hours)
+    pop = expand_layer(properties.get("probabilityOfPrecipitation") or {},
+                       start, hours) / 100
+    wind = expand_layer(properties.get("windSpeed") or {}, start, hours)
+    gust = expand_layer(properties.get("windGust") or {}, start, hours)
+    qpf = expand_layer(properties.get("quantitativePrecipitation") or {},
+                       start, hours, accumulated=True)
+
+    starts = np.arange(0, hours, 24)
+    pop = np.nan_to_num(pop)
+    stats = {
+        "temp_min": np.fmin.reduceat(temp, starts),
+        "temp_max": np.fmax.reduceat(temp, starts),
+        "temp_mean": _nanmean_reduceat(temp, starts),
+        "precip_chance_peak": np.maximum.reduceat(pop, starts),
+        "precip_chance_mean": np.add.reduceat(pop, starts) / 24,
+        "precip_total": np.add.reduceat(np.nan_to_num(qpf), starts),
+        "wind_peak": np.maximum.reduceat(np.nan_to_num(np.fmax(wind, gust)),
+                                         starts),
+    }
+    has_data = ~np.isnan(stats["temp_min"])
+    return [{
+        "date": (start + timedelta(days=i)).date().isoformat(),
+        **_row(stats, i),
+        "temperature_unit": "F"
+    } for i in np.flatnonzero(has_data).tolist()]
+
+
+def format_daily_summary(days: List[Dict[str, Any]]) -> str:
+    """Render per-day statistics as one line per day."""
+    lines = []
+    for day in days:
+        unit = day["temperature_unit"]
+        line = (f"{day['date']}: {day['temp_min']:.0f}–"
+                f"{day['temp_max']:.0f}°{unit} "
+                f"(mean {day['temp_mean']:.0f}°{unit}), "
+                f"precipitation chance peak {day['precip_chance_peak']:.0%} "
+                f"(mean {day['precip_chance_mean']:.0%})")
+        if "precip_total" in day:
+            line += f", total {day['precip_total']:.2f} in"
+        line += f", peak wind {day['wind_peak']:.0f} mph"
+        lines.append(line)
+    return "\n".join(lines)
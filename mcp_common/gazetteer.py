@@ -0,0 +1,413 @@
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from array import array
+from typing import TYPE_CHECKING, Iterable, List, NamedTuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(__file__), "data",
+                                 "places.tsv")
+DEFAULT_INDEX_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "beebot")
+
+INDEX_MAGIC = b"GAZ2"
+# magic, key count, data file size, data file mtime (ns), trigram count,
+# postings count
+INDEX_HEADER = struct.Struct("<4sIQQII")
+# Trigrams are stored UTF-8 encoded and NUL-padded to this many bytes.
+GRAM_BYTES = 12
+
+# At most this many lines are parsed while a qualifier filters the matching
+# names, and at most FUZZY_CANDIDATES near misses get an edit distance.
+MAX_PREFIX_SCAN = 500
+FUZZY_CANDIDATES = 30
+# One edit (OSA counts a transposition as one) changes at most this many of
+# a key's trigrams, which bounds how few a near miss can share.
+GRAMS_PER_EDIT = 4
+
+_ABBREVIATIONS = {"st": "saint", "ste": "sainte", "ft": "fort", "mt": "mount"}
+_QUALIFIER_ALIASES = {"usa": "us", "uk": "gb"}
+
+
+class Place(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+    country: str
+    admin1: str
+    population: int
+
+    @property
+    def label(self) -> str:
+        parts = (self.name, self.admin1, self.country)
+        return ", ".join(part for part in parts if part and not part.isdigit())
+
+
+def normalize_name(name: str) -> str:
+    """Fold a place name to the form used as an index key.
+
+    Accents and punctuation are dropped, case is folded and common
+    abbreviations are expanded, so "St. Louis" and "saint louis" match.
+    """
+    folded = unicodedata.normalize("NFKD", name)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    tokens = re.sub(r"[^\w]+", " ", folded.casefold()).split()
+    return " ".join(_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def _parse_line(line: bytes) -> tuple[Place, list[str]]:
+    cols = line.decode("utf-8").rstrip("\r\n").split("\t")
+    if len(cols) >= 19:
+        # Full GeoNames dump (e.g. cities15000.txt).
+        name, ascii_name, alternates = cols[1], cols[2], cols[3]
+        lat, lon, country, admin1, population = (cols[4], cols[5], cols[8],
+                                                 cols[10], cols[14])
+    else:
+        name, ascii_name, alternates, lat, lon, country, admin1, population = (
+            cols[:8])
+    place = Place(name, float(lat), float(lon), country, admin1,
+                  int(population or 0))
+    names = [name, ascii_name] + [n for n in alternates.split(",") if n]
+    return place, names
+
+
+def _osa_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, giving up once it exceeds limit.
+
+    Only the diagonal band of cells within ``limit`` of each other is
+    filled in; any alignment leaving it costs more than ``limit`` anyway.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    over = limit + 1
+    prev2: list[int] = []
+    prev = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        cur = [over] * (len(b) + 1)
+        cur[0] = best = i if i <= limit else over
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cb = b[j - 1]
+            value = prev[j - 1] + (ca != cb)
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if cur[j - 1] + 1 < value:
+                value = cur[j - 1] + 1
+            if (i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb
+                    and prev2[j - 2] + 1 < value):
+                value = prev2[j - 2] + 1
+            cur[j] = value if value < over else over
+            if value < best:
+                best = value
+        if best > limit:
+            return over
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _qualifies(place: Place, qualifier: str) -> bool:
+    return not qualifier or qualifier in (place.admin1.casefold(),
+                                          place.country.casefold())
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _u32(values: Iterable[int]) -> bytes:
+    return array("I", values).tobytes()
+
+
+class Gazetteer:
+    """Offline place-name lookup over a GeoNames-style tab-separated file.
+
+    The data file and an index built from it are memory-mapped, so opening
+    costs almost nothing regardless of size and only the pages a lookup
+    touches are read. The index is built once per data file version and
+    kept in the cache directory; building a large one takes seconds, so
+    callers on an event loop should ``open`` it in a thread first.
+
+    The index holds the normalized names in sorted order, with each name's
+    line offset and population, and a trigram table with posting lists of
+    name numbers. Exact and prefix lookups are a binary search for the range
+    of matching names, ranked by population without parsing any lines.
+    Misspellings fall back to the trigram postings: names sharing enough of
+    the query's trigrams to be within the edit limit are candidates, the
+    ones sharing most get an edit distance.
+    """
+
+    def __init__(self, path: str | None = None, index_dir: str | None = None):
+        self.path = path or os.getenv("GAZETTEER_PATH", DEFAULT_DATA_PATH)
+        self.index_dir = index_dir or DEFAULT_INDEX_DIR
+        self._lock = threading.Lock()
+        self._data = None
+        self._index = None
+        self._count = 0
+        self._key_offsets = None
+        self._keys_start = 0
+        self._line_offsets: "np.ndarray | None" = None
+        self._populations: "np.ndarray | None" = None
+        self._gram_starts: "np.ndarray | None" = None
+        self._postings: "np.ndarray | None" = None
+        self._grams: "np.ndarray | None" = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index is open, so lookups no longer block on a build."""
+        return self._index is not None
+
+    def open(self) -> None:
+        """Map the data file and index, building the index if it is stale.
+
+        Safe to call from several threads; only the first one does the work.
+        """
+        if self._index is not None:
+            return
+        with self._lock:
+            if self._index is None:
+                self._open()
+
+    def _open(self) -> None:
+        import numpy as np
+
+        with open(self.path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        stat = os.stat(self.path)
+
+        index_path = os.path.join(self.index_dir,
+                                  os.path.basename(self.path) + ".idx")
+        index = self._map_index(index_path, stat)
+        if index is None:
+            index = self._build_index(data, stat)
+            try:
+                os.makedirs(self.index_dir, exist_ok=True)
+                tmp_path = f"{index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(index)
+                os.replace(tmp_path, index_path)
+                index = self._map_index(index_path, stat) or index
+            except OSError:
+                # Read-only cache dir: keep the index in memory instead.
+                pass
+
+        _, count, _, _, grams, postings = INDEX_HEADER.unpack_from(index)
+        offset = INDEX_HEADER.size
+
+        def section(length: int) -> "np.ndarray":
+            nonlocal offset
+            values = np.frombuffer(index, dtype="<u4", count=length,
+                                   offset=offset)
+            offset += 4 * length
+            return values
+
+        # Binary search reads single offsets, which a memoryview does
+        # faster than numpy.
+        self._key_offsets = memoryview(index)[
+            offset:offset + 4 * (count + 1)].cast("I")
+        offset += 4 * (count + 1)
+        self._line_offsets = section(count)
+        self._populations = section(count)
+        self._gram_starts = section(grams + 1)
+        self._postings = section(postings)
+        self._grams = np.frombuffer(index, dtype=f"S{GRAM_BYTES}",
+                                    count=grams, offset=offset)
+        self._keys_start = offset + GRAM_BYTES * grams
+        self._count = count
+        self._data = data
+        self._index = index
+
+    def _map_index(self, index_path: str, stat: os.stat_result):
+        try:
+            with open(index_path, "rb") as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, _, size, mtime_ns, _, _ = INDEX_HEADER.unpack_from(index)
+        except struct.error:
+            magic = size = mtime_ns = None
+        if (magic, size, mtime_ns) != (INDEX_MAGIC, stat.st_size,
+                                       stat.st_mtime_ns):
+            index.close()
+            return None
+        return index
+
+    @staticmethod
+    def _build_index(data: mmap.mmap, stat: os.stat_result) -> bytes:
+        entries = []
+        offset = 0
+        for line in iter(data.readline, b""):
+            if line.strip() and not line.startswith(b"#"):
+                place, names = _parse_line(line)
+                population = min(place.population, 0xFFFFFFFF)
+                for key in {normalize_name(name) for name in names}:
+                    if key:
+                        entries.append((key, offset, population))
+            offset += len(line)
+        entries.sort(key=lambda entry: entry[0].encode("utf-8"))
+
+        postings: dict[bytes, array] = {}
+        keys = []
+        for i, (key, _, _) in enumerate(entries):
+            keys.append(key.encode("utf-8"))
+            for gram in _trigrams(key):
+                gram = gram.encode("utf-8")
+                if gram not in postings:
+                    postings[gram] = array("I")
+                postings[gram].append(i)
+        grams = sorted(postings)
+
+        key_offsets = [0]
+        for key in keys:
+            key_offsets.append(key_offsets[-1] + len(key))
+        gram_starts = [0]
+        for gram in grams:
+            gram_starts.append(gram_starts[-1] + len(postings[gram]))
+
+        header = INDEX_HEADER.pack(INDEX_MAGIC, len(entries), stat.st_size,
+                                   stat.st_mtime_ns, len(grams),
+                                   gram_starts[-1])
+        return b"".join([
+            header,
+            _u32(key_offsets),
+            _u32(entry[1] for entry in entries),
+            _u32(entry[2] for entry in entries),
+            _u32(gram_starts),
+            b"".join(postings[gram].tobytes() for gram in grams),
+            b"".join(gram.ljust(GRAM_BYTES, b"\0") for gram in grams),
+            b"".join(keys)
+        ])
+
+    def _key(self, i: int) -> bytes:
+        return self._index[self._keys_start + self._key_offsets[i]:
+                           self._keys_start + self._key_offsets[i + 1]]
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(self, key: bytes, prefix: bool) -> range:
+        """Numbers of the names equal to (or starting with) ``key``."""
+        # No UTF-8 name contains 0x00 or 0xff, so these sort just after
+        # every name equal to, or starting with, ``key``.
+        end = key + (b"\xff" if prefix else b"\0")
+        return range(self._lower_bound(key), self._lower_bound(end))
+
+    def _place_at(self, line_offset: int) -> Place:
+        end = self._data.find(b"\n", line_offset)
+        return _parse_line(self._data[line_offset:end if end >= 0 else None])[0]
+
+    def _places(self, names: range, qualifier: str, limit: int) -> List[Place]:
+        """The most populous places named in ``names`` that qualify."""
+        if not names:
+            return []
+        import numpy as np
+
+        populations = self._populations[names.start:names.stop]
+        wanted = len(names) if qualifier else limit
+        if wanted < len(names):
+            # Several names of one place can share a line, so keep spares.
+            wanted = min(len(names), 4 * limit)
+            top = np.argpartition(-populations, wanted - 1)[:wanted]
+        else:
+            top = np.arange(len(names))
+        top = top[np.argsort(-populations[top], kind="stable")]
+
+        places = []
+        seen = set()
+        for i in top[:MAX_PREFIX_SCAN].tolist():
+            line_offset = int(self._line_offsets[names.start + i])
+            if line_offset in seen:
+                continue
+            seen.add(line_offset)
+            place = self._place_at(line_offset)
+            if _qualifies(place, qualifier):
+                places.append(place)
+                if len(places) == limit:
+                    break
+        return places
+
+    def _fuzzy(self, key: str) -> list[tuple[int, int]]:
+        """Return ``(distance, line_offset)`` for keys close to ``key``."""
+        import numpy as np
+
+        grams = np.array(sorted(gram.encode("utf-8")
+                                for gram in _trigrams(key)),
+                         dtype=f"S{GRAM_BYTES}")
+        if not len(self._grams):
+            return []
+        slots = np.minimum(np.searchsorted(self._grams, grams),
+                           len(self._grams) - 1)
+        slots = slots[self._grams[slots] == grams]
+        starts = self._gram_starts[slots].tolist()
+        ends = self._gram_starts[slots + 1].tolist()
+        if not starts:
+            return []
+        shared = np.bincount(
+            np.concatenate([self._postings[start:end]
+                            for start, end in zip(starts, ends)]),
+            minlength=self._count)
+
+        limit = max(1, len(key) // 5)
+        candidates = np.flatnonzero(
+            shared >= len(grams) - GRAMS_PER_EDIT * limit)
+        best = candidates[np.argsort(-shared[candidates],
+                                     kind="stable")[:FUZZY_CANDIDATES]]
+
+        matches = []
+        for i in best.tolist():
+            entry_key = self._key(i).decode("utf-8")
+            distance = _osa_distance(key, entry_key, limit)
+            if distance <= limit:
+                matches.append((distance, int(self._line_offsets[i])))
+        return matches
+
+    def lookup(self, query: str, limit: int = 5) -> List[Place]:
+        """Find places matching ``query``, best match first.
+
+        ``query`` may carry a state/province or country code qualifier after
+        a comma ("Portland, ME", "London, GB"). Exact name matches win, then
+        prefix matches, then near misses by edit distance; ties are broken by
+        population.
+        """
+        self.open()
+        name, _, qualifier = query.rpartition(",")
+        if not name:
+            name, qualifier = qualifier, ""
+        qualifier = normalize_name(qualifier)
+        qualifier = _QUALIFIER_ALIASES.get(qualifier, qualifier)
+        key = normalize_name(name)
+        if not key:
+            return []
+
+        encoded = key.encode("utf-8")
+        places = self._places(self._range(encoded, prefix=False), qualifier,
+                              limit)
+        if not places and len(key) >= 3:
+            places = self._places(self._range(encoded, prefix=True),
+                                  qualifier, limit)
+        if places:
+            return places
+
+        matches = {}
+        for distance, line_offset in sorted(self._fuzzy(key)):
+            if line_offset not in matches:
+                place = self._place_at(line_offset)
+                if _qualifies(place, qualifier):
+                    matches[line_offset] = (distance, -place.population, place)
+        ranked = sorted(matches.values(), key=lambda m: m[:2])
+        return [place for _, _, place in ranked[:limit]]
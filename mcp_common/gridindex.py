@@ -0,0 +1,94 @@
+import math
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence
+
+Ring = Sequence[Sequence[float]]
+
+
+def point_in_ring(lat: float, lon: float, ring: Ring) -> bool:
+    """Ray-casting test for a GeoJSON ring of ``[lon, lat]`` positions."""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > lat) != (yj > lat) and (
+                lon < (xj - xi) * (lat - yi) / (yj - yi) + xi):
+            inside = not inside
+        j = i
+    return inside
+
+
+class _Cell:
+    __slots__ = ("ring", "value", "buckets")
+
+    def __init__(self, ring: Ring, value: Any, buckets: List[tuple]):
+        self.ring = ring
+        self.value = value
+        self.buckets = buckets
+
+
+class GridCellIndex:
+    """Spatial index of known grid-cell polygons.
+
+    Cells are filed under every fixed-size lat/lon bucket their bounding box
+    touches, so a lookup only tests the few polygons in the query point's
+    bucket. Bounded to ``max_cells`` with least-recently-used eviction.
+    """
+
+    def __init__(self, bucket_degrees: float = 0.05, max_cells: int = 20000):
+        self.bucket_degrees = bucket_degrees
+        self.max_cells = max_cells
+        self.hits = 0
+        self.misses = 0
+        self._cells: OrderedDict[str, _Cell] = OrderedDict()
+        self._buckets: Dict[tuple, List[str]] = {}
+
+    def _bucket(self, lat: float, lon: float) -> tuple:
+        return (math.floor(lat / self.bucket_degrees),
+                math.floor(lon / self.bucket_degrees))
+
+    def add(self, key: str, ring: Ring, value: Any) -> None:
+        """Index ``value`` under the polygon ``ring`` (GeoJSON outer ring)."""
+        if key in self._cells:
+            self._remove(key)
+
+        lons = [pos[0] for pos in ring]
+        lats = [pos[1] for pos in ring]
+        lat0, lon0 = self._bucket(min(lats), min(lons))
+        lat1, lon1 = self._bucket(max(lats), max(lons))
+        buckets = [(i, j) for i in range(lat0, lat1 + 1)
+                   for j in range(lon0, lon1 + 1)]
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, []).append(key)
+        self._cells[key] = _Cell(ring, value, buckets)
+
+        while len(self._cells) > self.max_cells:
+            self._remove(next(iter(self._cells)))
+
+    def _remove(self, key: str) -> None:
+        cell = self._cells.pop(key)
+        for bucket in cell.buckets:
+            keys = self._buckets[bucket]
+            keys.remove(key)
+            if not keys:
+                del self._buckets[bucket]
+
+    def discard(self, key: str) -> None:
+        """Remove the cell ``key``, if it is indexed."""
+        if key in self._cells:
+            self._remove(key)
+
+    def find(self, lat: float, lon: float) -> Any:
+        """Return the value of the cell containing the point, or None."""
+        for key in self._buckets.get(self._bucket(lat, lon), ()):
+            cell = self._cells[key]
+            if point_in_ring(lat, lon, cell.ring):
+                self._cells.move_to_end(key)
+                self.hits += 1
+                return cell.value
+        self.misses += 1
+        return None
+
+    def __len__(self) -> int:
+        return len(self._cells)
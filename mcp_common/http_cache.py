@@ -0,0 +1,126 @@
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping
+
+from .cache import TTLCache
+
+
+def _parse_cache_control(value: str) -> Dict[str, str | None]:
+    directives = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> float | None:
+    """Seconds a response stays fresh, or None if it must not be stored.
+
+    Follows RFC 9111 for a private (single-client) cache: ``max-age`` wins
+    over ``Expires``, the ``Age`` header is subtracted, and ``no-cache``
+    means "store but always revalidate". ``private`` responses may be
+    stored, and ``s-maxage``, which only applies to shared caches, is
+    ignored.
+    """
+    directives = _parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+
+    age = 0.0
+    try:
+        age = float(headers.get("Age", 0))
+    except ValueError:
+        pass
+
+    if directives.get("max-age") is not None:
+        try:
+            return max(0.0, float(directives["max-age"]) - age)
+        except ValueError:
+            return 0.0
+
+    expires = _http_date(headers.get("Expires"))
+    if expires is not None:
+        date = _http_date(headers.get("Date")) or time.time()
+        return max(0.0, expires - date)
+    return 0.0
+
+
+class HTTPResponseCache:
+    """Cache of decoded JSON bodies that honors HTTP caching headers.
+
+    Fresh entries are served directly. Stale entries are kept (up to
+    ``retention`` seconds) so they can be revalidated with ``If-None-Match`` /
+    ``If-Modified-Since``; a 304 just extends the stored entry. Hits, misses
+    and revalidations are counted per endpoint label.
+    """
+
+    def __init__(self, max_entries: int = 1000, retention: float = 6 * 3600):
+        self._entries = TTLCache(max_entries=max_entries, ttl=retention)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "revalidations": 0,
+                     "not_modified": 0})
+
+    def lookup(self, url: str,
+               endpoint: str) -> tuple[Dict[str, Any] | None, bool]:
+        """Return ``(entry, fresh)`` and count the outcome for ``endpoint``."""
+        entry = self._entries.get(url)
+        if entry is not None and entry["expires_at"] > time.time():
+            self.stats[endpoint]["hits"] += 1
+            return entry, True
+        if entry is not None and self.conditional_headers(entry):
+            self.stats[endpoint]["revalidations"] += 1
+            return entry, False
+        self.stats[endpoint]["misses"] += 1
+        return None, False
+
+    def stale(self, url: str) -> Any:
+        """The retained body for ``url`` however old it is, or None."""
+        entry = self._entries.get(url)
+        return entry["body"] if entry is not None else None
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, headers: Mapping[str, str], body: Any) -> None:
+        lifetime = freshness_lifetime(headers)
+        if lifetime is None:
+            self._entries.pop(url)
+            return
+        entry = {
+            "body": body,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "expires_at": time.time() + lifetime
+        }
+        if lifetime > 0 or self.conditional_headers(entry):
+            self._entries.set(url, entry)
+
+    def refresh(self, url: str, entry: Dict[str, Any], endpoint: str,
+                headers: Mapping[str, str]) -> Any:
+        """Handle a 304 for ``entry`` and return its cached body."""
+        self.stats[endpoint]["not_modified"] += 1
+        lifetime = freshness_lifetime(headers)
+        entry["expires_at"] = time.time() + (lifetime or 0.0)
+        if headers.get("ETag"):
+            entry["etag"] = headers["ETag"]
+        self._entries.set(url, entry)
+        return entry["body"]
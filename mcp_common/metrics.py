@@ -0,0 +1,231 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Latency bucket upper bounds in seconds, from a fresh cache hit to a slow
+# deep_research fan-out.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+# A collector returns (name, labels, value) samples, read as gauges.
+Sample = Tuple[str, Dict[str, Any], float]
+Collector = Callable[[], Iterable[Sample]]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as Prometheus exposes them."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile by interpolating within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                low = self.bounds[i - 1] if i else 0.0
+                return low + (self.bounds[i] - low) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, n in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += n
+            buckets["+Inf" if bound == float("inf") else f"{bound:g}"] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets
+        }
+
+
+class Metrics:
+    """In-process counters, gauges and latency histograms.
+
+    Series are keyed by name plus labels. Values that already live
+    elsewhere, such as cache hit counts, are not copied in: a collector
+    registered with ``add_collector`` reports them whenever a snapshot is
+    taken.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._collectors: List[Collector] = []
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add(self, name: str, amount: float, **labels: Any) -> None:
+        """Move a gauge up or down by ``amount``."""
+        key = (name, _labels(labels))
+        self.gauges[key] = self.gauges.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def in_flight(self, name: str, **labels: Any) -> Iterator[None]:
+        """Count the enclosed block in the ``name`` gauge while it runs."""
+        self.add(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.add(name, -1, **labels)
+
+    def add_collector(self, collect: Collector) -> None:
+        self._collectors.append(collect)
+
+    def collect(self) -> List[Tuple[str, Labels, float]]:
+        samples = []
+        for collect in self._collectors:
+            try:
+                samples.extend((name, _labels(labels), value)
+                               for name, labels, value in collect())
+            except Exception as e:
+                print(f"Metrics collector failed: {e}", file=sys.stderr)
+        return samples
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All series as JSON-friendly lists of ``{name, labels, ...}``."""
+
+        def series(key, **values):
+            name, labels = key
+            return {"name": name, "labels": dict(labels), **values}
+
+        gauges = [series(key, value=value) for key, value in self.gauges.items()]
+        gauges += [series((name, labels), value=value)
+                   for name, labels, value in self.collect()]
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "counters": [series(key, value=value)
+                         for key, value in sorted(self.counters.items())],
+            "gauges": sorted(gauges, key=lambda s: (s["name"],
+                                                     sorted(s["labels"].items()))),
+            "histograms": [series(key, **histogram.snapshot()) for key, histogram
+                           in sorted(self.histograms.items(),
+                                     key=lambda item: item[0])]
+        }
+
+    def to_prometheus(self, prefix: str = "mcp_") -> str:
+        """Render every series in the Prometheus text exposition format."""
+        lines: List[str] = []
+        typed = set()
+
+        def emit(kind, name, labels, value, suffix=""):
+            full = prefix + name
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} {kind}")
+            lines.append(f"{full}{suffix}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            emit("counter", name, labels, value)
+        gauges = list(self.gauges.items())
+        gauges += [((name, labels), value)
+                   for name, labels, value in self.collect()]
+        for (name, labels), value in sorted(gauges):
+            emit("gauge", name, labels, value)
+        for (name, labels), histogram in sorted(self.histograms.items(),
+                                                key=lambda item: item[0]):
+            cumulative = 0
+            for bound, n in zip(histogram.bounds + (float("inf"),),
+                                histogram.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                emit("histogram", name, labels + (("le", le),), cumulative,
+                     "_bucket")
+            lines.append(f"{prefix}{name}_sum{_format_labels(labels)} "
+                         f"{histogram.sum:g}")
+            lines.append(f"{prefix}{name}_count{_format_labels(labels)} "
+                         f"{histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically replace ``path`` with the current exposition text."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".prom.tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def dump_periodically(self, path: str, interval: float) -> None:
+        """Write the text file every ``interval`` seconds until cancelled.
+
+        Meant for node_exporter's textfile collector, which reads ``*.prom``
+        files from a directory.
+        """
+        while True:
+            try:
+                self.write_prometheus(path)
+            except OSError as e:
+                print(f"Could not write metrics to {path}: {e}",
+                      file=sys.stderr)
+            await asyncio.sleep(interval)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace(
+            "\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+
+def ratio(hits: float, misses: float) -> float:
+    """Hit ratio, 0.0 before any lookups."""
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+def cache_samples(cache: str, hits: float, misses: float) -> List[Sample]:
+    """Hit, miss and hit-ratio samples for one cache."""
+    return [("cache_hits", {"cache": cache}, hits),
+            ("cache_misses", {"cache": cache}, misses),
+            ("cache_hit_ratio", {"cache": cache}, ratio(hits, misses))]
+
+
+# Shared by every provider in the process; MCPHost serves it as metrics/get.
+metrics = Metrics()
@@ -0,0 +1,192 @@
+import functools
+import random
+import re
+import zlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+NUM_HASHES = 64
+# Signatures are split into bands of BAND_ROWS hashes for lookup; documents
+# sharing any band are compared in full. Two rows per band makes pairs with
+# a Jaccard similarity of 0.5 almost certain to be compared.
+BAND_ROWS = 2
+SHINGLE_SIZE = 3
+# Texts with fewer shingles than this are too short to compare reliably.
+MIN_SHINGLES = 4
+
+# Small enough that a * h + b fits in uint64 for a, b, h below it, so every
+# permutation of every shingle is one numpy expression.
+_MERSENNE_PRIME = (1 << 31) - 1
+
+_WORD = re.compile(r"\w+")
+
+Signature = tuple[int, ...]
+
+
+@functools.cache
+def _permutations() -> "tuple[np.ndarray, np.ndarray, int]":
+    import numpy as np
+
+    # Fixed seed: signatures must be comparable across calls and restarts.
+    rng = random.Random(0x5EED)
+    pairs = [(rng.randrange(1, _MERSENNE_PRIME),
+              rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_HASHES)]
+    a, b = (np.array(column, dtype=np.uint64) for column in zip(*pairs))
+    return a[:, None], b[:, None], rng.randrange(1, _MERSENNE_PRIME)
+
+
+def _shingle_hashes(text: str) -> "np.ndarray":
+    """Distinct hashes of the word 3-shingles in ``text``.
+
+    Each word is hashed once and the hashes are combined polynomially per
+    shingle, so no shingle strings are built.
+    """
+    import numpy as np
+
+    _, _, base = _permutations()
+    words = np.array([zlib.crc32(word.encode("utf-8"))
+                      for word in _WORD.findall(text.casefold())],
+                     dtype=np.uint64) % _MERSENNE_PRIME
+    count = len(words) - SHINGLE_SIZE + 1
+    if count <= 0:
+        return words[:0]
+    hashes = words[:count]
+    for offset in range(1, SHINGLE_SIZE):
+        hashes = (hashes * base
+                  + words[offset:offset + count]) % _MERSENNE_PRIME
+    return np.unique(hashes)
+
+
+def minhash(text: str) -> Signature | None:
+    """MinHash signature of ``text`` over word 3-shingles.
+
+    Returns None for texts too short to fingerprint reliably.
+    """
+    hashes = _shingle_hashes(text)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    a, b, _ = _permutations()
+    return tuple(((a * hashes + b) % _MERSENNE_PRIME).min(axis=1).tolist())
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _bands(signature: Signature) -> List[tuple]:
+    return [(i, signature[i:i + BAND_ROWS])
+            for i in range(0, len(signature), BAND_ROWS)]
+
+
+class _Cluster:
+    __slots__ = ("signature", "urls")
+
+    def __init__(self, signature: Signature):
+        self.signature = signature
+        self.urls: List[str] = []
+
+
+class FingerprintStore:
+    """Groups near-identical documents by MinHash, across calls.
+
+    Each cluster remembers every URL it has been seen under, so a document
+    syndicated under several URLs is recognised however it turns up later
+    in the session. Bounded to ``max_entries`` clusters, least recently
+    matched first out.
+    """
+
+    def __init__(self, threshold: float = 0.5, max_entries: int = 10000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.duplicates = 0
+        self._clusters: OrderedDict[int, _Cluster] = OrderedDict()
+        self._bands: Dict[tuple, set[int]] = {}
+        self._next_id = 0
+
+    def find(self, signature: Signature) -> int | None:
+        """Return the id of the cluster ``signature`` belongs to, if any."""
+        best, best_similarity = None, self.threshold
+        candidates = set()
+        for band in _bands(signature):
+            candidates.update(self._bands.get(band, ()))
+        for cluster_id in candidates:
+            score = similarity(signature, self._clusters[cluster_id].signature)
+            if score >= best_similarity:
+                best, best_similarity = cluster_id, score
+        return best
+
+    def add(self, signature: Signature, url: str) -> int:
+        """Record ``url`` under its cluster, creating one if needed."""
+        cluster_id = self.find(signature)
+        if cluster_id is None:
+            cluster_id = self._next_id
+            self._next_id += 1
+            self._clusters[cluster_id] = _Cluster(signature)
+            for band in _bands(signature):
+                self._bands.setdefault(band, set()).add(cluster_id)
+            while len(self._clusters) > self.max_entries:
+                self._remove(next(iter(self._clusters)))
+        else:
+            self._clusters.move_to_end(cluster_id)
+        cluster = self._clusters[cluster_id]
+        if url not in cluster.urls:
+            cluster.urls.append(url)
+        return cluster_id
+
+    def _remove(self, cluster_id: int) -> None:
+        cluster = self._clusters.pop(cluster_id)
+        for band in _bands(cluster.signature):
+            ids = self._bands[band]
+            ids.discard(cluster_id)
+            if not ids:
+                del self._bands[band]
+
+    def urls(self, cluster_id: int) -> List[str]:
+        cluster = self._clusters.get(cluster_id)
+        return list(cluster.urls) if cluster is not None else []
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+
+def _item_text(item: Dict[str, Any]) -> str:
+    return f"{item.get('title') or ''}\n{item.get('summary') or ''}"
+
+
+def merge_near_duplicates(
+    items: Iterable[Dict[str, Any]],
+    store: FingerprintStore,
+    text: Callable[[Dict[str, Any]], str] = _item_text,
+    url_key: str = "url",
+    max_urls: int = 5
+) -> List[Dict[str, Any]]:
+    """Collapse near-duplicate items into their first occurrence.
+
+    Every returned item gets a ``urls`` list: its own URL first, then up to
+    ``max_urls - 1`` other URLs its text is known under, from this call or
+    earlier ones sharing ``store``. Items are returned in input order.
+    """
+    merged: List[Dict[str, Any]] = []
+    by_cluster: Dict[int, Dict[str, Any]] = {}
+    for item in items:
+        url = item[url_key]
+        signature = minhash(text(item))
+        if signature is None:
+            merged.append({**item, "urls": [url]})
+            continue
+        cluster_id = store.add(signature, url)
+        if cluster_id in by_cluster:
+            store.duplicates += 1
+            continue
+        entry = {**item, "urls": [url]}
+        by_cluster[cluster_id] = entry
+        merged.append(entry)
+
+    for cluster_id, entry in by_cluster.items():
+        others = [u for u in store.urls(cluster_id) if u != entry[url_key]]
+        entry["urls"] = [entry[url_key]] + others[:max_urls - 1]
+    return merged
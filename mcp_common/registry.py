@@ -0,0 +1,188 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple
+
+from .dispatch import INVALID_PARAMS, METHOD_NOT_FOUND, RPCError
+from .metrics import Collector, Metrics, Sample, metrics as default_metrics
+from .results import ToolResult, to_reply
+from .tracing import set_attribute, tracer
+
+PROTOCOL_VERSION = "2024-11-05"
+
+Handler = Callable[[Dict[str, Any]], Awaitable["ToolResult | str"]]
+
+
+class Tool(NamedTuple):
+    schema: Dict[str, Any]
+    handler: Handler
+
+
+class ToolRegistry:
+    """Tools from any number of providers, looked up by name.
+
+    A provider registers each tool's schema with an async handler taking the
+    call's ``arguments``, plus an optional ``aclose`` to release its clients
+    when the host shuts down, an optional blocking ``warm_up`` that loads
+    heavy dependencies ahead of the first call, and optional metrics
+    collectors reporting state such as cache hit counts.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+        self._closers: List[Callable[[], Awaitable[None]]] = []
+        self._warmers: List[Callable[[], None]] = []
+        self._collectors: List[Collector] = []
+
+    def add(self, schema: Dict[str, Any], handler: Handler) -> None:
+        name = schema["name"]
+        if name in self._tools:
+            raise ValueError(f"Tool already registered: {name}")
+        self._tools[name] = Tool(schema, handler)
+
+    def on_close(self, aclose: Callable[[], Awaitable[None]]) -> None:
+        self._closers.append(aclose)
+
+    def on_warm_up(self, warm_up: Callable[[], None]) -> None:
+        self._warmers.append(warm_up)
+
+    def on_collect(self, collect: Collector) -> None:
+        self._collectors.append(collect)
+
+    def collect(self) -> Iterable[Sample]:
+        for collect in self._collectors:
+            yield from collect()
+
+    def warm_up(self) -> None:
+        """Run every provider's warm-up; failures are only logged."""
+        for warm_up in self._warmers:
+            try:
+                warm_up()
+            except Exception as e:
+                print(f"Warm-up failed: {e}", file=sys.stderr)
+
+    def get(self, name: str) -> Tool | None:
+        return self._tools.get(name)
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        return [tool.schema for tool in self._tools.values()]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    async def aclose(self) -> None:
+        for aclose in self._closers:
+            await aclose()
+
+
+class MCPHost:
+    """MCP request handler serving every tool in a registry.
+
+    Methods and tools are both dispatched by dict lookup, so adding a tool
+    is a ``registry.add`` call rather than another ``elif``.
+
+    Providers load heavy dependencies on first use, so initialize and
+    tools/list are answered without them. With ``MCP_WARM_UP=1`` they are
+    loaded in a background thread as soon as the client has connected.
+
+    Every tool call is timed and counted in ``metrics``, served as
+    ``metrics/get``. With ``MCP_METRICS_FILE`` set, the same numbers are
+    also written there in Prometheus text format every
+    ``MCP_METRICS_INTERVAL`` seconds (default 15).
+    """
+
+    def __init__(self, registry: ToolRegistry, name: str,
+                 version: str = "1.0.0", metrics: Metrics | None = None):
+        self.registry = registry
+        self.server_info = {"name": name, "version": version}
+        self.methods: Dict[str, Callable[[Dict[str, Any]],
+                                         Awaitable[Dict[str, Any]]]] = {
+            "initialize": self.initialize,
+            "tools/list": self.list_tools,
+            "tools/call": self.call_tool,
+            "metrics/get": self.get_metrics
+        }
+        self._warm_up: asyncio.Future | None = None
+        self.metrics = metrics or default_metrics
+        self.metrics.add_collector(registry.collect)
+        self.metrics_file = os.getenv("MCP_METRICS_FILE")
+        self._metrics_dump: asyncio.Task | None = None
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method = request.get("method")
+        handler = self.methods.get(method)
+        if handler is None:
+            raise RPCError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+        self.start_metrics_dump()
+        with self.metrics.in_flight("requests_in_flight", method=method):
+            return await handler(request)
+
+    def start_metrics_dump(self) -> None:
+        if self._metrics_dump is None and self.metrics_file:
+            self._metrics_dump = asyncio.create_task(
+                self.metrics.dump_periodically(
+                    self.metrics_file,
+                    float(os.getenv("MCP_METRICS_INTERVAL", "15"))))
+
+    def start_warm_up(self) -> None:
+        if self._warm_up is None and os.getenv("MCP_WARM_UP", "0") != "0":
+            self._warm_up = asyncio.get_running_loop().run_in_executor(
+                None, self.registry.warm_up)
+
+    async def initialize(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.start_warm_up()
+        return {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {
+                "tools": {}
+            },
+            "serverInfo": self.server_info
+        }
+
+    async def list_tools(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.start_warm_up()
+        return {"tools": self.registry.schemas()}
+
+    async def call_tool(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        params = request.get("params") or {}
+        tool_name = params.get("name")
+        tool = self.registry.get(tool_name)
+        if tool is None:
+            raise RPCError(INVALID_PARAMS, f"Unknown tool: {tool_name}")
+        set_attribute("mcp.tool.name", tool_name)
+        status = "exception"
+        start = time.perf_counter()
+        try:
+            with self.metrics.in_flight("tool_calls_in_flight", tool=tool_name):
+                result = await tool.handler(params.get("arguments") or {})
+            with tracer.span("mcp.format"):
+                reply = to_reply(result, request)
+            status = "error" if reply.get("isError") else "ok"
+            return reply
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            self.metrics.observe("tool_duration_seconds",
+                                 time.perf_counter() - start, tool=tool_name)
+            self.metrics.inc("tool_calls_total", tool=tool_name, status=status)
+
+    async def get_metrics(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return self.metrics.snapshot()
+
+    async def aclose(self) -> None:
+        try:
+            if self._metrics_dump is not None:
+                self._metrics_dump.cancel()
+                try:
+                    self.metrics.write_prometheus(self.metrics_file)
+                except OSError as e:
+                    print(f"Could not write metrics to {self.metrics_file}: "
+                          f"{e}", file=sys.stderr)
+        finally:
+            # Saves the points cache and closes clients whatever happens.
+            await self.registry.aclose()
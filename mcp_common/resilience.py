@@ -0,0 +1,152 @@
+import asyncio
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    Attempt ``n`` (from 0) waits a random time up to ``base_delay * 2**n``,
+    capped at ``max_delay``, so clients that failed together do not retry
+    together. A server's ``Retry-After`` is honoured up to ``max_delay``.
+    """
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.25,
+                 max_delay: float = 4.0,
+                 statuses: Iterable[int] = RETRYABLE_STATUSES):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = frozenset(statuses)
+
+    def backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        delay = random.uniform(
+            0, min(self.max_delay, self.base_delay * 2**attempt))
+        if retry_after:
+            delay = max(delay, min(self.max_delay,
+                                   parse_retry_after(retry_after)))
+        return delay
+
+
+def parse_retry_after(value: str) -> float:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class LatencyWindow:
+    """The most recent ``size`` latencies, for percentile estimates."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """None until ``min_samples`` latencies have been seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def hedge(call: Callable[[], Awaitable[T]],
+                delay: float | None) -> tuple[T, int]:
+    """Run ``call``, starting a second copy if it is still going at ``delay``.
+
+    Returns the first successful result and which copy produced it (0 for
+    the original, 1 for the hedge); the other copy is cancelled. If both
+    fail, the last failure is raised. ``delay=None`` never hedges.
+    """
+    pending = [asyncio.ensure_future(call())]
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                pending.append(asyncio.ensure_future(call()))
+        calls = list(pending)
+        while True:
+            done, _ = await asyncio.wait(pending,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            failed = None
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), calls.index(task)
+                failed = task
+            pending = [task for task in pending if not task.done()]
+            if not pending:
+                raise failed.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class CircuitBreaker:
+    """Stop calling an upstream after repeated consecutive failures.
+
+    After ``failure_threshold`` failures in a row the circuit opens and
+    ``allow`` refuses calls for ``reset_timeout`` seconds. Then it goes
+    half-open: one probe call is let through, and its outcome closes or
+    re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+        if self.state == self.HALF_OPEN:
+            # A probe that never reported back (e.g. was cancelled) stops
+            # blocking new probes after reset_timeout.
+            if (self._probe_started is not None
+                    and now - self._probe_started < self.reset_timeout):
+                return False
+            self._probe_started = now
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if (self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold):
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_started = None
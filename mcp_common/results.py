@@ -0,0 +1,312 @@
+import json
+import os
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+RESULT_FORMATS = ("text", "structured", "both")
+
+# Rough characters per token for English text, used to turn token budgets
+# into character budgets without running a tokenizer.
+CHARS_PER_TOKEN = 4
+# Descriptions are never shortened below this many characters; past that,
+# whole items are dropped instead.
+MIN_DESCRIPTION_CHARS = 200
+ELLIPSIS = "…"
+
+# (list key in the data, text fields of its items that may be shortened).
+# Lists come in priority order: items are dropped from the last list first,
+# and from the end of each list.
+TrimSpec = Sequence[Tuple[str, Sequence[str]]]
+
+
+def compact(value: Any) -> Any:
+    """Drop None values and empty containers from nested dicts."""
+    if isinstance(value, dict):
+        return {
+            k: compact(v)
+            for k, v in value.items() if v is not None and v != [] and v != {}
+        }
+    if isinstance(value, list):
+        return [compact(v) for v in value]
+    return value
+
+
+def to_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False,
+                      default=str)
+
+
+class ToolResult:
+    """A tool's output as structured data, with the text view rendered lazily.
+
+    ``data`` must be a JSON object. ``render`` turns it into the markdown the
+    tools have always returned; it only runs when a client actually asks for
+    text, and runs at most once per result.
+    """
+
+    __slots__ = ("data", "is_error", "trim", "_render", "_text")
+
+    def __init__(self, data: Dict[str, Any],
+                 render: Callable[[Dict[str, Any]], str],
+                 is_error: bool = False, trim: TrimSpec = ()):
+        self.data = data
+        self.is_error = is_error
+        self.trim = trim
+        self._render = render
+        self._text: str | None = None
+
+    @classmethod
+    def message(cls, text: str, is_error: bool = False) -> "ToolResult":
+        """A result that is just a message, e.g. "no alerts"."""
+        return cls({"message": text}, lambda data: data["message"], is_error)
+
+    def with_data(self, **changes: Any) -> "ToolResult":
+        """A copy with some top-level data fields replaced."""
+        return ToolResult({**self.data, **changes}, self._render,
+                          self.is_error, self.trim)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._render(self.data)
+        return self._text
+
+    def reply(self, result_format: str = "text",
+              max_chars: int | None = None) -> Dict[str, Any]:
+        """Build the ``tools/call`` result in the requested format.
+
+        ``structured`` returns the data only as ``structuredContent``, with
+        a one-line summary as text for clients that only show text, and
+        never renders markdown; ``both`` pairs it with the rendered
+        markdown. With ``max_chars`` the text, or in ``structured`` the
+        data's JSON, is trimmed to fit (see ``fit_budget``).
+        """
+        data, text = self.data, None
+        if result_format != "structured":
+            if max_chars is None:
+                text = self.text
+            else:
+                data, text = fit_budget(self.data, self._render, self.trim,
+                                        max_chars)
+        else:
+            if max_chars is not None:
+                data, _ = fit_budget(self.data, to_json, self.trim, max_chars)
+            text = summarize(data)
+
+        if result_format == "text":
+            reply = {"content": [{"type": "text", "text": text}]}
+        else:
+            reply = {
+                "content": [{"type": "text", "text": text}],
+                "structuredContent": data
+            }
+        if self.is_error:
+            reply["isError"] = True
+        return reply
+
+
+def summarize(data: Dict[str, Any]) -> str:
+    """The text content of a ``structured`` reply: one line, not the data."""
+    if isinstance(data.get("message"), str):
+        return data["message"]
+    counts = ", ".join(f"{len(value)} {key}" for key, value in data.items()
+                       if isinstance(value, list))
+    return "Result in structuredContent" + (f" ({counts})."
+                                             if counts else ".")
+
+
+def _shorten(text: str, cap: int) -> str:
+    if len(text) <= cap:
+        return text
+    cut = text[:cap - len(ELLIPSIS)]
+    # Prefer ending on a word boundary when one is close.
+    space = cut.rfind(" ", cap // 2)
+    return (cut[:space] if space > 0 else cut).rstrip() + ELLIPSIS
+
+
+def _description_cap(lengths: List[int], excess: int,
+                     floor: int = MIN_DESCRIPTION_CHARS) -> int:
+    """Smallest shortening of the longest texts that removes ``excess``.
+
+    Returns the length to cap every text at: the longest texts are cut
+    first, down to the next-longest and so on, never below ``floor``.
+    """
+    lengths = sorted(lengths, reverse=True)
+    removed = 0
+    for i, length in enumerate(lengths):
+        following = lengths[i + 1] if i + 1 < len(lengths) else 0
+        following = max(following, floor)
+        if length <= following:
+            break
+        # Bringing the i + 1 longest texts down to `following` removes this.
+        step = (length - following) * (i + 1)
+        if removed + step >= excess:
+            return length - -(-(excess - removed) // (i + 1))
+        removed += step
+    return floor
+
+
+def _copy_lists(data: Dict[str, Any], trim: TrimSpec) -> Dict[str, Any]:
+    data = dict(data)
+    for key, _ in trim:
+        data[key] = [dict(item) for item in data.get(key) or []]
+    return data
+
+
+def _drop_last(data: Dict[str, Any], trim: TrimSpec,
+               count: int) -> Dict[str, Any]:
+    data = dict(data)
+    # Lets the renderer tell "nothing to show" from "all dropped".
+    data["truncated"] = {"dropped": count}
+    for key, _ in reversed(trim):
+        items = data.get(key) or []
+        keep = max(0, len(items) - count)
+        count -= len(items) - keep
+        data[key] = items[:keep]
+    return data
+
+
+def _clamp(text: str, max_chars: int) -> str:
+    if max_chars <= len(ELLIPSIS):
+        return text[:max(0, max_chars)]
+    return _shorten(text, max_chars)
+
+
+def _trim_notes(max_chars: int, shortened: int, dropped: int, total: int,
+                omitted: int) -> List[str]:
+    """The notes saying what was trimmed, longest first."""
+    return [
+        (f"\n\n[Output trimmed to fit about {max_chars} characters "
+         f"(~{max_chars // CHARS_PER_TOKEN} tokens): {shortened} items "
+         f"shortened, {dropped} of {total} items dropped, "
+         f"{omitted} characters omitted.]"),
+        f"\n\n[Trimmed: {shortened} shortened, {dropped} dropped.]",
+        ""
+    ]
+
+
+def fit_budget(data: Dict[str, Any], render: Callable[[Dict[str, Any]], str],
+               trim: TrimSpec, max_chars: int) -> tuple[Dict[str, Any], str]:
+    """Trim ``data`` until ``render(data)`` fits in ``max_chars``.
+
+    The longest descriptions are shortened first (evenly, down to
+    MIN_DESCRIPTION_CHARS); if that is not enough, the lowest-ranked items
+    are dropped. Returns the trimmed data, with a ``truncated`` summary when
+    anything was cut, and its rendering ending in a note saying how many
+    items were shortened and dropped. The note is abbreviated or left out
+    when the budget is too small for it, and text that still does not fit
+    is cut off, so the result never exceeds ``max_chars``. Data the trim
+    spec does not cover is returned as is.
+    """
+    text = render(data)
+    if len(text) <= max_chars:
+        return data, text
+    if not trim:
+        return data, _clamp(text, max_chars)
+
+    original = len(text)
+    total_items = sum(len(data.get(key) or []) for key, _ in trim)
+    data = _copy_lists(data, trim)
+    fields = [(item, field) for key, names in trim for item in data[key]
+              for field in names if isinstance(item.get(field), str)]
+
+    # Keep room for the longest note that takes at most half the budget,
+    # sized with the largest counts it could report.
+    reserve = next(len(note) for note in _trim_notes(
+        max_chars, total_items, total_items, total_items, original)
+                   if len(note) <= max_chars // 2)
+    room = max_chars - reserve
+    shortened_items = set()
+    excess = len(text) - room
+    cap = _description_cap([len(item[f]) for item, f in fields], excess)
+    for item, field in fields:
+        if len(item[field]) > cap:
+            item[field] = _shorten(item[field], cap)
+            shortened_items.add(id(item))
+    text = render(data)
+
+    # Binary search for the fewest lowest-ranked items to drop.
+    dropped = 0
+    if len(text) > room and total_items:
+        lo, hi = 1, total_items
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if len(render(_drop_last(data, trim, mid))) <= room:
+                hi = mid
+            else:
+                lo = mid + 1
+        dropped = lo
+        if dropped == total_items:
+            # Rather than showing nothing, keep the top item with its
+            # texts cut below MIN_DESCRIPTION_CHARS if that makes it fit.
+            top = _drop_last(data, trim, total_items - 1)
+            texts = [(item, field) for key, names in trim
+                     for item in top[key] for field in names
+                     if isinstance(item.get(field), str)]
+            cap = _description_cap([len(item[f]) for item, f in texts],
+                                   len(render(top)) - room, len(ELLIPSIS) + 1)
+            for item, field in texts:
+                if len(item[field]) > cap:
+                    item[field] = _shorten(item[field], cap)
+                    shortened_items.add(id(item))
+            if len(render(top)) <= room:
+                dropped = total_items - 1
+        data = _drop_last(data, trim, dropped)
+        text = render(data)
+
+    # Items shortened and then dropped only count as dropped.
+    shortened = sum(id(item) in shortened_items for key, _ in trim
+                    for item in data[key])
+    data["truncated"] = {
+        "shortened": shortened,
+        "dropped": dropped,
+        "of": total_items,
+        "omitted_chars": original - len(text)
+    }
+    for note in _trim_notes(max_chars, shortened, dropped, total_items,
+                            original - len(text)):
+        if len(text) + len(note) <= max_chars:
+            return data, text + note if text else note.lstrip()
+    return data, _clamp(text, max_chars)
+
+
+def output_budget(request: Dict[str, Any]) -> int | None:
+    """The output budget for a ``tools/call`` request, in characters.
+
+    The server-wide budget comes from ``MCP_MAX_OUTPUT_CHARS`` and/or
+    ``MCP_MAX_OUTPUT_TOKENS``; a call can lower it with
+    ``params._meta.maxOutputChars`` or ``maxOutputTokens``. Tokens are
+    approximated as CHARS_PER_TOKEN characters. None means no budget.
+    """
+    params = request.get("params") or {}
+    meta = params.get("_meta") or {}
+    limits = []
+    for chars, tokens in ((os.getenv("MCP_MAX_OUTPUT_CHARS"),
+                           os.getenv("MCP_MAX_OUTPUT_TOKENS")),
+                          (meta.get("maxOutputChars"),
+                           meta.get("maxOutputTokens"))):
+        if chars:
+            limits.append(int(chars))
+        if tokens:
+            limits.append(int(tokens) * CHARS_PER_TOKEN)
+    return min(limits) if limits else None
+
+
+def result_format(request: Dict[str, Any]) -> str:
+    """The result format a ``tools/call`` request asked for.
+
+    Clients opt in per call with ``params._meta.resultFormat``; the
+    server-wide default comes from ``MCP_RESULT_FORMAT`` (``text`` unless
+    set).
+    """
+    params = request.get("params") or {}
+    meta = params.get("_meta") or {}
+    chosen = meta.get("resultFormat") or os.getenv("MCP_RESULT_FORMAT",
+                                                   "text")
+    return chosen if chosen in RESULT_FORMATS else "text"
+
+
+def to_reply(result: "ToolResult | str", request: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a tool's return value into a ``tools/call`` result."""
+    if isinstance(result, str):
+        result = ToolResult.message(result)
+    return result.reply(result_format(request), output_budget(request))
@@ -0,0 +1,89 @@
+import asyncio
+import functools
+import json
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().casefold()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def call_key(name: str, arguments: Any) -> str:
+    """Build a coalescing key from a tool name and its arguments.
+
+    Strings are stripped and case-folded, and dict keys are sorted, so
+    "New York" and " new york" share a key.
+    """
+    return json.dumps([name, _normalize(arguments)], sort_keys=True,
+                      default=str)
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share one in-flight execution among identical concurrent calls.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task and get the same result (or
+    exception). The work is only cancelled once every waiter has gone.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(
+                lambda _, call=call: self._forget(key, call))
+            self.started += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def coalesce(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Coalesce identical concurrent calls to an async method.
+
+    The instance must have a ``flights`` attribute holding a SingleFlight.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key = call_key(method.__name__, [args, kwargs])
+        return await self.flights.do(key,
+                                     lambda: method(self, *args, **kwargs))
+
+    return wrapper
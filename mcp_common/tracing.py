@@ -0,0 +1,212 @@
+import contextvars
+import json
+import os
+import re
+import secrets
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+# W3C trace context: version-traceid-parentid-flags.
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+# OTLP enum values; OTLP/JSON encodes enums as integers.
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_ERROR = 2
+# Flush buffered spans at least this often, even mid-request.
+MAX_BUFFERED_SPANS = 512
+
+
+class Span:
+    """One timed operation, exported in the OTLP span shape."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind",
+                 "start_ns", "end_ns", "attributes", "error", "local_root")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None = None,
+                 kind: str = "internal",
+                 attributes: Dict[str, Any] | None = None,
+                 start_ns: int | None = None, local_root: bool = False):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = dict(attributes or {})
+        self.error: str | None = None
+        # First span of this trace in this process; ending it flushes.
+        self.local_root = local_root
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def child(self, name: str, kind: str = "internal",
+              attributes: Dict[str, Any] | None = None,
+              start_ns: int | None = None) -> "Span":
+        return Span(name, self.trace_id, self.span_id, kind, attributes,
+                    start_ns)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": key, "value": _any_value(value)}
+                           for key, value in self.attributes.items()],
+            "status": {}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error is not None:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+def _any_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "current_span", default=None)
+
+
+def parse_trace_context(meta: Any) -> tuple[str, str] | None:
+    """``(trace_id, parent_span_id)`` from a request's ``_meta``, if any.
+
+    Accepts a W3C ``traceparent`` string, or separate ``traceId`` and
+    ``parentSpanId`` hex strings.
+    """
+    if not isinstance(meta, dict):
+        return None
+    traceparent = meta.get("traceparent")
+    if isinstance(traceparent, str):
+        match = TRACEPARENT.match(traceparent.strip().lower())
+        if match:
+            return match[1], match[2]
+    trace_id, parent_id = meta.get("traceId"), meta.get("parentSpanId")
+    if (isinstance(trace_id, str) and re.fullmatch(r"[0-9a-f]{32}", trace_id)
+            and isinstance(parent_id, str)
+            and re.fullmatch(r"[0-9a-f]{16}", parent_id)):
+        return trace_id, parent_id
+    return None
+
+
+class Tracer:
+    """Records spans and appends them to a JSONL file.
+
+    Each line is one OTLP/JSON ``ExportTraceServiceRequest``, the format the
+    OpenTelemetry Collector's file exporter writes and its ``otlpjsonfile``
+    receiver reads. Spans are buffered and written when the first span of a
+    request in this process ends. With no ``path``, spans are still created
+    (so trace context can be passed on) but never written.
+    """
+
+    def __init__(self, path: str | None = None,
+                 service_name: str = "beebot-tools"):
+        self.path = path
+        self.service_name = service_name
+        self._buffer: List[Span] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def start_span(self, name: str, kind: str = "internal",
+                   context: tuple[str, str] | None = None,
+                   attributes: Dict[str, Any] | None = None,
+                   start_ns: int | None = None) -> Span:
+        """Start a span that continues ``context``, or a new trace.
+
+        The span is not made current; end it with ``finish``.
+        """
+        trace_id, parent_id = context or (secrets.token_hex(16), None)
+        return Span(name, trace_id, parent_id, kind, attributes, start_ns,
+                    local_root=True)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal",
+             attributes: Dict[str, Any] | None = None) -> Iterator[Span]:
+        """Run the block as a child of the current span (or a new trace)."""
+        parent = current_span.get()
+        span = (parent.child(name, kind, attributes) if parent is not None
+                else self.start_span(name, kind, attributes=attributes))
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(str(e) or type(e).__name__)
+            raise
+        finally:
+            current_span.reset(token)
+            self.finish(span)
+
+    def record(self, parent: Span, name: str, start_ns: int, end_ns: int,
+               attributes: Dict[str, Any] | None = None) -> None:
+        """Record an already-timed child of ``parent``."""
+        span = parent.child(name, attributes=attributes, start_ns=start_ns)
+        span.end_ns = end_ns
+        self.finish(span)
+
+    def finish(self, span: Span) -> None:
+        if span.end_ns is None:
+            span.end_ns = time.time_ns()
+        if not self.enabled:
+            return
+        self._buffer.append(span)
+        if span.local_root or len(self._buffer) >= MAX_BUFFERED_SPANS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        spans, self._buffer = self._buffer, []
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [{
+                        "key": "service.name",
+                        "value": {"stringValue": self.service_name}
+                    }]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "mcp_common.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }, separators=(",", ":"))
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Could not write spans to {self.path}: {e}",
+                  file=sys.stderr)
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Set an attribute on the current span, if there is one."""
+    span = current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+# Enabled by MCP_TRACE_FILE; shared by the dispatcher and every provider.
+tracer = Tracer(os.getenv("MCP_TRACE_FILE"),
+                os.getenv("OTEL_SERVICE_NAME", "beebot-tools"))
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import stat
+import sys
+from typing import Any, Dict
+
+# Lines longer than this are read in chunks instead of failing the reader.
+READ_CHUNK_LIMIT = 64 * 1024
+DEFAULT_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+# Once this many reply bytes are waiting, senders wait for the flush.
+WRITE_HIGH_WATER = 1024 * 1024
+
+
+class MessageTooLarge(Exception):
+    """Raised when an input line exceeds the transport's message size limit."""
+
+
+def _pollable(stream) -> bool:
+    """Whether the event loop can watch ``stream`` for readiness.
+
+    epoll refuses regular files and character devices such as /dev/null,
+    and asyncio only finds out once the watch is registered in a callback,
+    too late to fall back; so decide from the file type up front.
+    """
+    try:
+        fd = stream.fileno()
+        mode = os.fstat(fd).st_mode
+    except (AttributeError, OSError, ValueError):
+        return False
+    return (stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+            or (stat.S_ISCHR(mode) and os.isatty(fd)))
+
+
+class StdioTransport:
+    """Newline-delimited JSON over stdin/stdout using asyncio streams.
+
+    Reads never block the event loop. Replies are buffered and written in one
+    batch per loop iteration, so a burst of replies costs one write and one
+    drain rather than a flush per message.
+    """
+
+    def __init__(self, stdin=None, stdout=None,
+                 max_message_bytes: int | None = None):
+        if max_message_bytes is None:
+            max_message_bytes = int(
+                os.getenv("MCP_MAX_MESSAGE_BYTES", DEFAULT_MAX_MESSAGE_BYTES))
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self.max_message_bytes = max_message_bytes
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._pending: list[bytes] = []
+        self._pending_bytes = 0
+        self._flush_task: asyncio.Task | None = None
+
+    async def open(self) -> "StdioTransport":
+        loop = asyncio.get_running_loop()
+
+        self._reader = asyncio.StreamReader(limit=READ_CHUNK_LIMIT)
+        if _pollable(self.stdin):
+            protocol = asyncio.StreamReaderProtocol(self._reader)
+            await loop.connect_read_pipe(lambda: protocol, self.stdin)
+        else:
+            # Files and /dev/null can't be watched by the event loop; feed
+            # the reader from a thread instead.
+            loop.create_task(self._feed_from_file(self._reader))
+
+        if _pollable(self.stdout):
+            transport, protocol = await loop.connect_write_pipe(
+                asyncio.streams.FlowControlMixin, self.stdout)
+            self._writer = asyncio.StreamWriter(transport, protocol, None, loop)
+        else:
+            self._writer = None
+        return self
+
+    async def _feed_from_file(self, reader: asyncio.StreamReader) -> None:
+        loop = asyncio.get_running_loop()
+        stream = getattr(self.stdin, "buffer", self.stdin)
+        while True:
+            chunk = await loop.run_in_executor(None, stream.read1,
+                                               READ_CHUNK_LIMIT)
+            if not chunk:
+                reader.feed_eof()
+                return
+            reader.feed_data(chunk)
+
+    async def readline(self) -> bytes | None:
+        """Return the next line without its newline, or None at EOF.
+
+        Lines may arrive split across many reads and may be far longer than
+        the stream buffer; they are reassembled here. A final line with no
+        trailing newline is still returned.
+        """
+        line = bytearray()
+        while True:
+            try:
+                chunk = await self._reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                line += e.partial
+                return bytes(line) if line else None
+            except asyncio.LimitOverrunError as e:
+                chunk = await self._reader.read(e.consumed)
+                line += chunk
+                if len(line) > self.max_message_bytes:
+                    await self._skip_line()
+                    raise MessageTooLarge(
+                        f"Message exceeds {self.max_message_bytes} bytes")
+                continue
+
+            line += chunk[:-1]
+            if len(line) > self.max_message_bytes:
+                raise MessageTooLarge(
+                    f"Message exceeds {self.max_message_bytes} bytes")
+            return bytes(line)
+
+    async def _skip_line(self) -> None:
+        while True:
+            try:
+                await self._reader.readuntil(b"\n")
+                return
+            except asyncio.IncompleteReadError:
+                return
+            except asyncio.LimitOverrunError as e:
+                await self._reader.read(e.consumed)
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Queue a message for the next batched write."""
+        data = json.dumps(message).encode() + b"\n"
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon())
+        if self._pending_bytes >= WRITE_HIGH_WATER:
+            await asyncio.shield(self._flush_task)
+
+    async def _flush_soon(self) -> None:
+        # Let every reply that is ready in this loop iteration join the batch,
+        # then keep going until nothing queued up behind the drain.
+        await asyncio.sleep(0)
+        while self._pending:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending.clear()
+        self._pending_bytes = 0
+
+        if self._writer is None:
+            stream = getattr(self.stdout, "buffer", self.stdout)
+            stream.write(data)
+            stream.flush()
+            return
+        self._writer.write(data)
+        await self._writer.drain()
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+        if self._writer is not None:
+            self._writer.close()
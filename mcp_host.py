@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""One MCP server process for every Python tool.
+
+Serves the weather and search tools over a single stdio connection, so a
+client needs one interpreter instead of one per server. Which providers are
+loaded is set by MCP_HOST_TOOLS (default "weather,search"); a provider that
+cannot start, e.g. search without EXA_API_KEY, is skipped with a warning.
+"""
+import asyncio
+import importlib
+import os
+import sys
+
+from mcp_common import MCPHost, ToolRegistry, serve
+
+# Provider name -> module exposing register_tools(registry).
+PROVIDERS = {"weather": "weather_server", "search": "search_server"}
+
+
+def build_registry(names: list[str]) -> ToolRegistry:
+    registry = ToolRegistry()
+    for name in names:
+        module_name = PROVIDERS.get(name)
+        if module_name is None:
+            print(f"Unknown tool provider '{name}', skipping", file=sys.stderr)
+            continue
+        try:
+            importlib.import_module(module_name).register_tools(registry)
+        except (ImportError, ValueError) as e:
+            print(f"Tool provider '{name}' unavailable: {e}", file=sys.stderr)
+    return registry
+
+
+class MCPHostServer(MCPHost):
+
+    def __init__(self, providers: list[str] | None = None):
+        if providers is None:
+            providers = [
+                name.strip() for name in os.getenv(
+                    "MCP_HOST_TOOLS", ",".join(PROVIDERS)).split(",")
+                if name.strip()
+            ]
+        super().__init__(build_registry(providers), "beebot-tools")
+
+
+async def main():
+    await serve(MCPHostServer())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
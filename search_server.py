@@ -1,126 +1,402 @@
 #!/usr/bin/env python3
 
-import json
 import sys
 import asyncio
+import importlib.util
 import os
-from typing import Dict, Any, Optional
-try:
-    from exa_py import Exa
-except ImportError:
-    print(
-        "exa_py package not found. Please install it with: pip install exa-py",
-        file=sys.stderr)
-    sys.exit(1)
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional
 from datetime import datetime, timedelta
 
-
-class MCPServer:
-
-    def __init__(self):
-        api_key = os.getenv('EXA_API_KEY')
-        if not api_key:
-            raise ValueError("EXA_API_KEY environment variable is required")
-        self.exa = Exa(api_key=api_key)
-
-    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        method = request.get("method")
-
-        if method == "initialize":
-            return {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {}
-                },
-                "serverInfo": {
-                    "name": "search-server",
-                    "version": "1.0.0"
-                }
+from mcp_common import report_progress, serve
+from mcp_common.context import progress_requested
+from mcp_common.fanout import SubQuery, fan_out, merge_ranked, normalize_url
+from mcp_common.metrics import Metrics, Sample, cache_samples
+from mcp_common.metrics import metrics as default_metrics
+from mcp_common.neardup import FingerprintStore, merge_near_duplicates
+from mcp_common.registry import MCPHost, ToolRegistry
+from mcp_common.results import ToolResult, compact, to_json
+from mcp_common.cache import TTLCache
+from mcp_common.singleflight import SingleFlight, call_key, coalesce
+from mcp_common.tracing import tracer
+
+EXA_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+# deep_research lists results published within this many days first.
+RECENT_DAYS = 90
+
+
+def published_window(days: int) -> tuple[str, str]:
+    """Return Exa start/end published dates covering the last ``days`` days.
+
+    Both ends are rounded to midnight (the end to the start of tomorrow), so
+    every call on the same day asks for, and caches under, the same window.
+    """
+    tomorrow = datetime.combine(datetime.now().date() + timedelta(days=1),
+                                datetime.min.time())
+    start = tomorrow - timedelta(days=days + 1)
+    return start.strftime(EXA_DATE_FORMAT), tomorrow.strftime(EXA_DATE_FORMAT)
+
+
+def research_items(result: Any) -> list[Dict[str, Any]]:
+    """Extract the results that have a summary from an Exa response."""
+    return [{
+        'title': item.title,
+        'url': item.url,
+        'summary': item.summary,
+        'published_date': getattr(item, 'published_date', None)
+    } for item in result.results if getattr(item, 'summary', None)]
+
+
+def is_recent(published_date: Optional[str]) -> bool:
+    """Whether an Exa published date falls within the last RECENT_DAYS."""
+    if not published_date:
+        return False
+    try:
+        pub_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    return (datetime.now() - pub_date.replace(tzinfo=None)).days < RECENT_DAYS
+
+
+def result_entry(item: Dict[str, Any]) -> Dict[str, Any]:
+    """The compact form of a search result used in tool replies."""
+    return compact({
+        'title': item['title'],
+        'url': item['url'],
+        'also_at': item['urls'][1:],
+        'published_date': item['published_date'],
+        'summary': item['summary']
+    })
+
+
+def format_web_results(data: Dict[str, Any]) -> str:
+    parts = [f"Search Results for: \"{data['query']}\"\n\n"]
+    for i, item in enumerate(data['results'], 1):
+        if i > 1:
+            parts.append("\n")
+        parts.append(f"**Result {i}: {item['title']}**\n")
+        parts.append(f"URL: {item['url']}\n")
+        if item.get('also_at'):
+            parts.append(f"Also at: {', '.join(item['also_at'])}\n")
+        if item.get('published_date'):
+            parts.append(f"Published: {item['published_date']}\n")
+        if item.get('summary'):
+            parts.append(f"Summary: {item['summary']}\n")
+        parts.append("\n")
+    return "".join(parts)
+
+
+def format_research_header(topic: str, focus: str) -> str:
+    return f"**Deep Research Analysis: {topic}**\nFocus Area: {focus}\n\n"
+
+
+def format_research_section(heading: str, items: list[Dict[str, Any]]) -> str:
+    parts = [f"## {heading}\n\n"]
+    for item in items:
+        parts.append(f"**{item['title']}**\n")
+        parts.append(f"Source: {item['url']}\n")
+        if item.get('also_at'):
+            parts.append(f"Also at: {', '.join(item['also_at'])}\n")
+        if item.get('published_date'):
+            parts.append(f"Published: {item['published_date']}\n")
+        parts.append(f"{item['summary']}\n\n---\n\n")
+    return "".join(parts)
+
+
+def format_research(data: Dict[str, Any]) -> str:
+    parts = [format_research_header(data['topic'], data['focus'])]
+    if data['recent']:
+        parts.append(format_research_section("Recent Developments",
+                                             data['recent']))
+    if data['analysis']:
+        parts.append(format_research_section("Comprehensive Analysis",
+                                             data['analysis']))
+    parts.append("## Key Sources\n\n")
+    for i, item in enumerate(data['sources'], 1):
+        parts.append(f"{i}. [{item['title']}]({item['url']})\n")
+    return "".join(parts)
+
+
+def research_queries(topic: str, focus: str, start_date: str, recent_start: str,
+                     end_date: str) -> list[SubQuery]:
+    """Sub-queries deep_research fans out to, most important first."""
+    summary = {
+        "query":
+        "Generate comprehensive analysis with detailed insights, key findings, recent developments, and important context"
+    }
+
+    def search(query: str, num_results: int, start: str) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "type": "auto",
+            "num_results": num_results,
+            "start_published_date": start,
+            "end_published_date": end_date,
+            "livecrawl": "preferred",
+            "summary": summary,
+            "extras": {
+                "links": 1,
+                "image_links": 0
             }
-        elif method == "tools/list":
-            return {
-                "tools": [{
-                    "name": "web_search",
-                    "description":
-                    "Search the web for current information and content",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Search query"
-                            },
-                            "num_results": {
-                                "type": "integer",
-                                "description":
-                                "Number of results to return (1-10)",
-                                "minimum": 1,
-                                "maximum": 10,
-                                "default": 5
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                }, {
-                    "name": "deep_research",
+        }
+
+    return [
+        SubQuery(
+            "overview",
+            search(
+                f"Research {topic} with focus on {focus}. Provide comprehensive analysis, key findings, recent developments, and authoritative sources.",
+                8, start_date), 1.0),
+        SubQuery("recent",
+                 search(f"Latest news and developments on {topic}: {focus}",
+                        3, recent_start), 0.8),
+        SubQuery(
+            "technical",
+            search(
+                f"In-depth technical explanation and key data on {topic}, {focus}",
+                5, start_date), 0.8),
+        SubQuery(
+            "counterpoints",
+            search(
+                f"Criticism, limitations and opposing views on {topic}, {focus}",
+                4, start_date), 0.6),
+    ]
+
+
+def result_size(result: ToolResult) -> int:
+    """Approximate memory held by a cached tool result."""
+    return 2 * len(to_json(result.data)) + 256
+
+
+TOOL_SCHEMAS = [{
+        "name": "web_search",
+        "description":
+        "Search the web for current information and content",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query"
+                },
+                "num_results": {
+                    "type": "integer",
                     "description":
-                    "Perform comprehensive research on a topic with detailed analysis",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "topic": {
-                                "type": "string",
-                                "description": "Research topic or question"
-                            },
-                            "focus": {
-                                "type": "string",
-                                "description":
-                                "Specific aspect to focus on (optional)",
-                                "default": "general overview"
-                            }
-                        },
-                        "required": ["topic"]
-                    }
-                }]
-            }
-        elif method == "tools/call":
-            tool_name = request["params"]["name"]
-            arguments = request["params"]["arguments"]
-
-            if tool_name == "web_search":
-                return await self.web_search(arguments)
-            elif tool_name == "deep_research":
-                return await self.deep_research(arguments)
-            else:
-                return {
-                    "error": {
-                        "code": -32601,
-                        "message": f"Unknown tool: {tool_name}"
-                    }
+                    "Number of results to return (1-10)",
+                    "minimum": 1,
+                    "maximum": 10,
+                    "default": 5
                 }
-        else:
-            return {
-                "error": {
-                    "code": -32601,
-                    "message": f"Unknown method: {method}"
+            },
+            "required": ["query"]
+        }
+    }, {
+        "name": "deep_research",
+        "description":
+        "Perform comprehensive research on a topic with detailed analysis",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "topic": {
+                    "type": "string",
+                    "description": "Research topic or question"
+                },
+                "focus": {
+                    "type": "string",
+                    "description":
+                    "Specific aspect to focus on (optional)",
+                    "default": "general overview"
                 }
-            }
-
-    async def web_search(self, args: Dict[str, Any]) -> Dict[str, Any]:
+            },
+            "required": ["topic"]
+        }
+    }]
+
+
+class SearchTools:
+    """Exa-backed web search and research tools."""
+
+    def __init__(self, metrics: Metrics | None = None):
+        # Only check exa_py is installed: importing it takes about a second,
+        # so that waits for the first search (see the ``exa`` property).
+        if importlib.util.find_spec("exa_py") is None:
+            raise ImportError(
+                "exa_py package not found. Please install it with: pip install exa-py")
+        self.api_key = os.getenv('EXA_API_KEY')
+        if not self.api_key:
+            raise ValueError("EXA_API_KEY environment variable is required")
+        self._exa = None
+        self._exa_lock = threading.Lock()
+        self.flights = SingleFlight()
+        self.metrics = metrics or default_metrics
+        self.result_cache = TTLCache(
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "512")),
+            max_bytes=int(
+                os.getenv("SEARCH_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+            sizeof=result_size)
+        self.cache_ttls = {
+            "web_search": float(os.getenv("SEARCH_CACHE_TTL_WEB_SEARCH",
+                                          "900")),
+            "deep_research": float(
+                os.getenv("SEARCH_CACHE_TTL_DEEP_RESEARCH", "3600"))
+        }
+
+        # The Exa SDK is synchronous, so calls run in a bounded worker pool
+        # to keep the event loop free while livecrawl and summaries run.
+        self.exa_max_concurrency = int(os.getenv("EXA_MAX_CONCURRENCY", "6"))
+        self.exa_timeout = float(os.getenv("EXA_TIMEOUT", "60"))
+        self._exa_pool = ThreadPoolExecutor(
+            max_workers=self.exa_max_concurrency, thread_name_prefix="exa")
+        self._exa_slots = asyncio.Semaphore(self.exa_max_concurrency)
+
+        # Near-duplicate results are recognised across calls, not just
+        # within one reply.
+        self.fingerprints = FingerprintStore(
+            threshold=float(os.getenv("SEARCH_DEDUP_THRESHOLD", "0.5")),
+            max_entries=int(os.getenv("SEARCH_DEDUP_MAX_ENTRIES", "10000")))
+
+        # deep_research sends at most this many Exa searches per call and
+        # formats whatever has come back by the deadline.
+        self.research_budget = int(os.getenv("DEEP_RESEARCH_MAX_QUERIES", "4"))
+        # Research sub-queries, from all deep_research calls together, hold
+        # at most this many Exa slots at once; the rest of the pool stays
+        # free for web_search, which a user is waiting on. By default two
+        # slots are kept back and one call's sub-queries all run in a
+        # single round, so it takes about as long as one search.
+        self.research_concurrency = int(os.getenv(
+            "DEEP_RESEARCH_MAX_CONCURRENCY",
+            str(max(1, min(self.research_budget,
+                           self.exa_max_concurrency - 2)))))
+        self._research_slots = asyncio.Semaphore(self.research_concurrency)
+        self.research_deadline = float(
+            os.getenv("DEEP_RESEARCH_DEADLINE", "40"))
+
+    @property
+    def exa(self) -> Any:
+        """The Exa client, importing exa_py on first use."""
+        if self._exa is None:
+            with self._exa_lock:
+                if self._exa is None:
+                    from exa_py import Exa
+                    self._exa = Exa(api_key=self.api_key)
+        return self._exa
+
+    @exa.setter
+    def exa(self, client: Any) -> None:
+        self._exa = client
+
+    def warm_up(self) -> None:
+        """Import exa_py and create the client ahead of the first search."""
+        self.exa
+
+    async def aclose(self):
+        self._exa_pool.shutdown(wait=False, cancel_futures=True)
+
+    def collect_metrics(self) -> List[Sample]:
+        """Cache and dedup figures for the metrics endpoint."""
+        return cache_samples("search_results", self.result_cache.hits,
+                             self.result_cache.misses) + [
+            ("cache_bytes", {"cache": "search_results"},
+             self.result_cache.total_bytes),
+            ("near_duplicates_merged", {}, self.fingerprints.duplicates),
+            ("coalesced_calls", {"provider": "search"}, self.flights.shared)
+        ]
+
+    async def search_and_contents(self, **kwargs) -> Any:
+        """Run ``Exa.search_and_contents`` off the event loop.
+
+        At most ``exa_max_concurrency`` calls run at once, and each gets
+        ``exa_timeout`` seconds once it has a slot. A timed-out or cancelled
+        call stops being awaited. One still queued for a worker is dropped,
+        but one already running keeps its worker thread until the SDK
+        returns, as the SDK cannot be interrupted. It keeps its slot until
+        then too, so later calls queue for a slot rather than spend their
+        own timeout waiting for a busy worker.
+        """
+        loop = asyncio.get_running_loop()
+        attributes = {"exa.query": kwargs.get("query"),
+                      "exa.num_results": kwargs.get("num_results")}
+        await self._exa_slots.acquire()
+        try:
+            work = self._exa_pool.submit(self._search_and_contents, **kwargs)
+        except BaseException:
+            self._exa_slots.release()
+            raise
+        work.add_done_callback(lambda _: self._release_exa_slot(loop))
+        start = time.perf_counter()
+        try:
+            with self.metrics.in_flight(
+                    "upstream_in_flight", upstream="exa"), tracer.span(
+                        "exa search_and_contents", "client", attributes):
+                return await asyncio.wait_for(asyncio.wrap_future(work),
+                                              self.exa_timeout)
+        except asyncio.CancelledError:
+            self.metrics.inc("upstream_cancelled_total", upstream="exa",
+                             endpoint="search")
+            raise
+        except asyncio.TimeoutError:
+            self.metrics.inc("upstream_errors_total", upstream="exa",
+                             endpoint="search", cause="timeout")
+            raise TimeoutError(
+                f"Exa search timed out after {self.exa_timeout:g}s")
+        except Exception as e:
+            self.metrics.inc("upstream_errors_total", upstream="exa",
+                             endpoint="search", cause=type(e).__name__)
+            raise
+        finally:
+            self.metrics.observe("upstream_duration_seconds",
+                                 time.perf_counter() - start,
+                                 upstream="exa", endpoint="search")
+            self.metrics.inc("upstream_requests_total", upstream="exa",
+                             endpoint="search")
+
+    def _release_exa_slot(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Called from the worker thread (or the canceller) when an SDK call
+        # is really over.
+        try:
+            loop.call_soon_threadsafe(self._exa_slots.release)
+        except RuntimeError:
+            pass  # The loop has closed; nothing is waiting for the slot.
+
+    def _search_and_contents(self, **kwargs) -> Any:
+        # Runs in the worker pool, so a first-use import of exa_py happens
+        # off the event loop too.
+        return self.exa.search_and_contents(**kwargs)
+
+    def merge_duplicates(
+            self, items: Iterable[Dict[str, Any]]) -> list[Dict[str, Any]]:
+        """Merge near-duplicate results, remembering them for this session."""
+        return merge_near_duplicates(items, self.fingerprints)
+
+    async def web_search(self, args: Dict[str, Any]) -> ToolResult:
+        # Identical searches that differ only in case or spacing share one
+        # result; echo this caller's own query in it.
+        reply = await self._web_search(args)
+        if "query" in reply.data:
+            return reply.with_data(query=args["query"])
+        return reply
+
+    @coalesce
+    async def _web_search(self, args: Dict[str, Any]) -> ToolResult:
         try:
             query = args["query"]
             num_results = args.get("num_results", 5)
+            start_date, end_date = published_window(365)
+
+            cache_key = call_key("web_search",
+                                 [query, num_results, start_date, end_date])
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
             # Perform search with content
-            result = self.exa.search_and_contents(
+            result = await self.search_and_contents(
                 query=query,
                 type="auto",
                 num_results=num_results,
-                start_published_date=(
-                    datetime.now() -
-                    timedelta(days=365)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
-                end_published_date=datetime.now().strftime(
-                    "%Y-%m-%dT%H:%M:%S.%fZ"),
+                start_published_date=start_date,
+                end_published_date=end_date,
                 livecrawl="preferred",
                 summary={
                     "query":
@@ -131,168 +407,176 @@ class MCPServer:
                     "image_links": 0
                 })
 
-            # Format results
-            formatted_results = []
-            for i, item in enumerate(result.results, 1):
-                formatted_result = f"**Result {i}: {item.title}**\n"
-                formatted_result += f"URL: {item.url}\n"
-                if hasattr(item, 'published_date') and item.published_date:
-                    formatted_result += f"Published: {item.published_date}\n"
-                if hasattr(item, 'summary') and item.summary:
-                    formatted_result += f"Summary: {item.summary}\n"
-                formatted_result += "\n"
-                formatted_results.append(formatted_result)
-
-            content = f"Search Results for: \"{query}\"\n\n" + "\n".join(
-                formatted_results)
-
-            return {"content": [{"type": "text", "text": content}]}
+            # Merge syndicated copies of the same article
+            items = self.merge_duplicates({
+                'title': item.title,
+                'url': item.url,
+                'summary': getattr(item, 'summary', None),
+                'published_date': getattr(item, 'published_date', None)
+            } for item in result.results)
+
+            reply = ToolResult(
+                {
+                    "query": query,
+                    "results": [result_entry(item) for item in items]
+                },
+                format_web_results,
+                trim=[("results", ("summary", ))])
+            self.result_cache.set(cache_key, reply,
+                                  ttl=self.cache_ttls["web_search"])
+            return reply
 
         except Exception as e:
-            return {
-                "content": [{
-                    "type": "text",
-                    "text": f"Error performing web search: {str(e)}"
-                }],
-                "isError":
-                True
-            }
-
-    async def deep_research(self, args: Dict[str, Any]) -> Dict[str, Any]:
+            return ToolResult.message(
+                f"Error performing web search: {str(e)}", is_error=True)
+
+    async def deep_research(self, args: Dict[str, Any]) -> ToolResult:
+        reply = await self._deep_research(args)
+        if "topic" in reply.data:
+            return reply.with_data(
+                topic=args["topic"],
+                focus=args.get("focus", "general overview"))
+        return reply
+
+    @coalesce
+    async def _deep_research(self, args: Dict[str, Any]) -> ToolResult:
         try:
 
             topic = args["topic"]
             focus = args.get("focus", "general overview")
+            start_date, end_date = published_window(730)
 
-            # Create research task
-            research_query = f"Research {topic} with focus on {focus}. Provide comprehensive analysis, key findings, recent developments, and authoritative sources."
-
-            # Perform comprehensive search
-            result = self.exa.search_and_contents(
-                query=research_query,
-                type="auto",
-                num_results=8,
-                start_published_date=(
-                    datetime.now() -
-                    timedelta(days=730)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
-                end_published_date=datetime.now().strftime(
-                    "%Y-%m-%dT%H:%M:%S.%fZ"),
-                livecrawl="preferred",
-                summary={
-                    "query":
-                    "Generate comprehensive analysis with detailed insights, key findings, recent developments, and important context"
-                },
-                extras={
-                    "links": 1,
-                    "image_links": 0
-                })
+            cache_key = call_key("deep_research",
+                                 [topic, focus, start_date, end_date])
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-            # Format research findings
-            content = f"**Deep Research Analysis: {topic}**\n"
-            content += f"Focus Area: {focus}\n\n"
+            # Research the topic from several angles at once, sharing the
+            # research share of the Exa pool with other deep_research calls.
+            recent_start, _ = published_window(RECENT_DAYS)
+            queries = research_queries(topic, focus, start_date, recent_start,
+                                       end_date)
 
-            # Group results by relevance and recency
             recent_results = []
+            completed = 0
+            streaming = progress_requested()
+
+            async def on_result(query: SubQuery, result: Any) -> None:
+                nonlocal completed
+                completed += 1
+                message = None
+                if query.name == "recent":
+                    recent_results.extend(
+                        self.merge_duplicates(research_items(result))[:3])
+                    if recent_results and streaming:
+                        message = format_research_header(
+                            topic, focus) + format_research_section(
+                                "Recent Developments",
+                                [result_entry(i) for i in recent_results])
+                await report_progress(completed, len(queries) + 1, message)
+
+            async def search(params: Dict[str, Any]) -> Any:
+                async with self._research_slots:
+                    return await self.search_and_contents(**params)
+
+            results = await fan_out(search, queries, self.research_budget,
+                                    self.research_deadline, on_result)
+            failures = [
+                f"{name}: {result}" for name, result in results.items()
+                if isinstance(result, Exception)
+            ]
+            if len(failures) == len(results):
+                raise RuntimeError("; ".join(failures)
+                                   or "no research searches finished in time")
+            for failure in failures:
+                print(f"Research search failed: {failure}", file=sys.stderr)
+
+            streamed = bool(recent_results)
+            merged = self.merge_duplicates(
+                merge_ranked(
+                    (query.weight, research_items(results[query.name]))
+                    for query in queries if query.name in results
+                    and not isinstance(results[query.name], Exception)))
+
+            seen = {
+                normalize_url(url)
+                for item in recent_results for url in item['urls']
+            }
             comprehensive_results = []
+            for item in merged:
+                if any(normalize_url(url) in seen for url in item['urls']):
+                    continue
+                # Fall back to the merged results for recent items when the
+                # recent search found nothing.
+                if (not streamed and len(recent_results) < 3
+                        and is_recent(item['published_date'])):
+                    recent_results.append(item)
+                else:
+                    comprehensive_results.append(item)
 
-            for item in result.results:
-                if hasattr(item, 'summary') and item.summary:
-                    formatted_item = {
-                        'title': item.title,
-                        'url': item.url,
-                        'summary': item.summary,
-                        'published_date': getattr(item, 'published_date', None)
-                    }
-
-                    # Categorize by recency (if published date available)
-                    if formatted_item['published_date']:
-                        try:
-                            pub_date = datetime.fromisoformat(
-                                formatted_item['published_date'].replace(
-                                    'Z', '+00:00'))
-                            if (datetime.now() -
-                                    pub_date.replace(tzinfo=None)).days < 90:
-                                recent_results.append(formatted_item)
-                            else:
-                                comprehensive_results.append(formatted_item)
-                        except:
-                            comprehensive_results.append(formatted_item)
-                    else:
-                        comprehensive_results.append(formatted_item)
-
-            # Add recent developments section
-            if recent_results:
-                content += "## Recent Developments\n\n"
-                for item in recent_results[:3]:
-                    content += f"**{item['title']}**\n"
-                    content += f"Source: {item['url']}\n"
-                    if item['published_date']:
-                        content += f"Published: {item['published_date']}\n"
-                    content += f"{item['summary']}\n\n---\n\n"
-
-            # Add comprehensive analysis section
-            if comprehensive_results:
-                content += "## Comprehensive Analysis\n\n"
-                for item in comprehensive_results[:5]:
-                    content += f"**{item['title']}**\n"
-                    content += f"Source: {item['url']}\n"
-                    if item['published_date']:
-                        content += f"Published: {item['published_date']}\n"
-                    content += f"{item['summary']}\n\n---\n\n"
-
-            # Add key sources section
-            content += "## Key Sources\n\n"
             all_sources = recent_results + comprehensive_results
-            for i, item in enumerate(all_sources[:8], 1):
-                content += f"{i}. [{item['title']}]({item['url']})\n"
-
-            return {"content": [{"type": "text", "text": content}]}
+            reply = ToolResult(
+                {
+                    "topic": topic,
+                    "focus": focus,
+                    "recent": [result_entry(item) for item in recent_results],
+                    "analysis":
+                    [result_entry(item) for item in comprehensive_results[:5]],
+                    "sources": [{
+                        "title": item['title'],
+                        "url": item['url']
+                    } for item in all_sources[:8]]
+                },
+                format_research,
+                trim=[("recent", ("summary", )), ("analysis", ("summary", )),
+                      ("sources", ())])
+            if reply.data["analysis"] and streaming:
+                await report_progress(
+                    len(queries) + 1, len(queries) + 1,
+                    format_research_section("Comprehensive Analysis",
+                                            reply.data["analysis"]))
+            self.result_cache.set(cache_key, reply,
+                                  ttl=self.cache_ttls["deep_research"])
+            return reply
 
         except Exception as e:
-            return {
-                "content": [{
-                    "type": "text",
-                    "text": f"Error performing deep research: {str(e)}"
-                }],
-                "isError":
-                True
-            }
+            return ToolResult.message(
+                f"Error performing deep research: {str(e)}", is_error=True)
 
 
-async def main():
-    server = MCPServer()
+def register_tools(registry: ToolRegistry,
+                   search: SearchTools | None = None) -> SearchTools:
+    """Register the search tools, backed by ``search``, with a registry."""
+    search = search or SearchTools()
+    handlers = {
+        "web_search": search.web_search,
+        "deep_research": search.deep_research
+    }
+    for schema in TOOL_SCHEMAS:
+        registry.add(schema, handlers[schema["name"]])
+    registry.on_warm_up(search.warm_up)
+    registry.on_close(search.aclose)
+    registry.on_collect(search.collect_metrics)
+    return search
 
-    while True:
-        try:
-            line = input()
-            if not line.strip():
-                continue
 
-            request = json.loads(line)
-            result = await server.handle_request(request)
+class MCPServer(MCPHost):
+    """Serves only the search tools; see mcp_host.py for all tools at once."""
 
-            response = {
-                "jsonrpc": "2.0",
-                "id": request.get("id"),
-                "result": result
-            }
+    def __init__(self):
+        registry = ToolRegistry()
+        self.search = register_tools(registry)
+        super().__init__(registry, "search-server")
 
-            print(json.dumps(response))
-            sys.stdout.flush()
 
-        except EOFError:
-            break
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32000,
-                    "message": str(e)
-                }
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+async def main():
+    try:
+        server = MCPServer()
+    except ImportError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    await serve(server)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,8 @@
 import { EventEmitter } from "events";
 import { spawn, ChildProcess } from "child_process";
 import { randomUUID } from "crypto";
-import { promises as fs } from "fs";
 import { EventSource } from "eventsource";
+import { Span } from "./tracing";
 
 interface ChatMessage {
   role: "user" | "assistant" | "system" | "tool";
@@ -32,18 +32,174 @@ interface ToolCall {
   };
 }
 
+type PendingRequest = { resolve: Function; reject: Function };
+
+// One Python tool host (mcp_host.py) per Node process, shared by every
+// MCPChatClient, so sessions don't each pay for their own interpreters.
+class MCPHostConnection {
+  private static instance: MCPHostConnection | null = null;
+
+  private process: ChildProcess | null = null;
+  private pendingRequests: Map<string, PendingRequest> = new Map();
+  private users = 0;
+
+  static acquire(): MCPHostConnection {
+    if (!MCPHostConnection.instance) {
+      MCPHostConnection.instance = new MCPHostConnection();
+    }
+    MCPHostConnection.instance.users++;
+    return MCPHostConnection.instance;
+  }
+
+  release() {
+    this.users = Math.max(0, this.users - 1);
+    if (this.users === 0) {
+      this.process?.kill();
+      this.process = null;
+      MCPHostConnection.instance = null;
+    }
+  }
+
+  private start(): ChildProcess {
+    if (this.process) return this.process;
+
+    const child = spawn("python3", ["mcp_host.py"], {
+      stdio: ["pipe", "pipe", "pipe"],
+    });
+    this.process = child;
+
+    // Replies can arrive batched several to a chunk or split across chunks,
+    // so keep any trailing partial line until the rest of it arrives.
+    let stdoutBuffer = "";
+    child.stdout?.on("data", (data) => {
+      stdoutBuffer += data.toString();
+      const parts = stdoutBuffer.split("\n");
+      stdoutBuffer = parts.pop() || "";
+      const lines = parts.filter((line: string) => line.trim());
+
+      for (const line of lines) {
+        try {
+          const message = JSON.parse(line);
+
+          if (message.id && this.pendingRequests.has(message.id)) {
+            const { resolve, reject } = this.pendingRequests.get(message.id)!;
+            this.pendingRequests.delete(message.id);
+
+            if (message.error) {
+              reject(new Error(message.error.message || "MCP Error"));
+            } else {
+              resolve(message.result);
+            }
+          }
+        } catch (error) {
+          // Ignore parsing errors
+        }
+      }
+    });
+
+    child.stderr?.on("data", (data) => {
+      console.error("MCP tool host error:", data.toString());
+    });
+
+    // Fail whatever was in flight and start a fresh host on the next request.
+    child.on("exit", () => {
+      if (this.process === child) this.process = null;
+      for (const { reject } of Array.from(this.pendingRequests.values())) {
+        reject(new Error("MCP tool host exited"));
+      }
+      this.pendingRequests.clear();
+    });
+
+    return child;
+  }
+
+  // The timeout also travels to the host as params._meta.timeoutMs, so the
+  // host gives up on the work at the same time we give up on the reply. An
+  // aborted or timed-out request is cancelled in the host with
+  // notifications/cancelled, which stops its tool call and upstream requests.
+  request(method: string, params: any = {}, timeoutMs = 45000, signal?: AbortSignal): Promise<any> {
+    return new Promise((resolve, reject) => {
+      if (signal?.aborted) {
+        reject(new Error("MCP request aborted"));
+        return;
+      }
+
+      let server: ChildProcess;
+      try {
+        server = this.start();
+      } catch (error) {
+        reject(error);
+        return;
+      }
+
+      if (!server.stdin) {
+        reject(new Error("MCP tool host not available"));
+        return;
+      }
+
+      const id = randomUUID();
+      const request = {
+        jsonrpc: "2.0",
+        id,
+        method,
+        params: { ...params, _meta: { ...params._meta, timeoutMs } },
+      };
+
+      let timer: NodeJS.Timeout;
+      const settle = () => {
+        clearTimeout(timer);
+        signal?.removeEventListener("abort", onAbort);
+        this.pendingRequests.delete(id);
+      };
+      const cancel = (reason: string) => {
+        if (!this.pendingRequests.has(id)) return;
+        settle();
+        this.notify("notifications/cancelled", { requestId: id, reason });
+        reject(new Error(`MCP tool host request ${reason}`));
+      };
+      const onAbort = () => cancel("aborted");
+
+      this.pendingRequests.set(id, {
+        resolve: (result: any) => {
+          settle();
+          resolve(result);
+        },
+        reject: (error: Error) => {
+          settle();
+          reject(error);
+        },
+      });
+
+      try {
+        server.stdin.write(JSON.stringify(request) + "\n");
+      } catch (error) {
+        settle();
+        reject(error);
+        return;
+      }
+
+      timer = setTimeout(() => cancel("timeout"), timeoutMs); // Longer timeout for search operations
+      signal?.addEventListener("abort", onAbort, { once: true });
+    });
+  }
+
+  // A JSON-RPC notification: no id and no reply.
+  private notify(method: string, params: any = {}) {
+    try {
+      this.process?.stdin?.write(JSON.stringify({ jsonrpc: "2.0", method, params }) + "\n");
+    } catch (error) {
+      // The host is gone, so there is nothing left to tell
+    }
+  }
+}
+
 export class MCPChatClient extends EventEmitter {
   private apiKey: string;
   private apiUrl: string;
   private model: string;
-  private weatherServer: ChildProcess | null = null;
-  private searchServer: ChildProcess | null = null;
+  private toolHost: MCPHostConnection | null = null;
   private jinaApiKey: string | null = null;
   private availableTools: MCPTool[] = [];
-  private pendingRequests: Map<
-    string,
-    { resolve: Function; reject: Function }
-  > = new Map();
 
   constructor(
     apiKey: string,
@@ -56,239 +212,22 @@ export class MCPChatClient extends EventEmitter {
     this.model = model;
     this.jinaApiKey = process.env.JINA_API_KEY || null;
 
-    this.initializeWeatherServer();
+    this.initializeToolHost();
     this.initializeJinaTools();
     // Note: Removed old search server initialization - using Jina instead
   }
 
-  private async initializeWeatherServer() {
+  private async initializeToolHost() {
     try {
-      // Create the weather server file
-      const weatherServerCode = `#!/usr/bin/env python3
-import json
-import sys
-import asyncio
-import httpx
-from typing import Any, Dict
-
-# Weather tools implementation
-class WeatherTools:
-    NWS_API_BASE = "https://api.weather.gov"
-    USER_AGENT = "weather-app/1.0"
-    
-    async def make_nws_request(self, url: str) -> Dict[str, Any] | None:
-        """Make a request to the NWS API with proper error handling."""
-        headers = {
-            "User-Agent": self.USER_AGENT,
-            "Accept": "application/geo+json"
-        }
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers, timeout=30.0)
-                response.raise_for_status()
-                return response.json()
-            except Exception:
-                return None
-
-    def format_alert(self, feature: dict) -> str:
-        """Format an alert feature into a readable string."""
-        props = feature["properties"]
-        return f"""
-Event: {props.get('event', 'Unknown')}
-Area: {props.get('areaDesc', 'Unknown')}
-Severity: {props.get('severity', 'Unknown')}
-Description: {props.get('description', 'No description available')}
-Instructions: {props.get('instruction', 'No specific instructions provided')}
-"""
-
-    async def get_alerts(self, state: str) -> str:
-        """Get weather alerts for a US state."""
-        url = f"{self.NWS_API_BASE}/alerts/active/area/{state}"
-        data = await self.make_nws_request(url)
-
-        if not data or "features" not in data:
-            return "Unable to fetch alerts or no alerts found."
-
-        if not data["features"]:
-            return "No active alerts for this state."
-
-        alerts = [self.format_alert(feature) for feature in data["features"]]
-        return "\\n---\\n".join(alerts)
-
-    async def get_forecast(self, latitude: float, longitude: float) -> str:
-        """Get weather forecast for a location."""
-        points_url = f"{self.NWS_API_BASE}/points/{latitude},{longitude}"
-        points_data = await self.make_nws_request(points_url)
-
-        if not points_data:
-            return "Unable to fetch forecast data for this location."
-
-        forecast_url = points_data["properties"]["forecast"]
-        forecast_data = await self.make_nws_request(forecast_url)
-
-        if not forecast_data:
-            return "Unable to fetch detailed forecast."
-
-        periods = forecast_data["properties"]["periods"]
-        forecasts = []
-        for period in periods[:5]:
-            forecast = f"""
-{period['name']}:
-Temperature: {period['temperature']}°{period['temperatureUnit']}
-Wind: {period['windSpeed']} {period['windDirection']}
-Forecast: {period['detailedForecast']}
-"""
-            forecasts.append(forecast)
-
-        return "\\n---\\n".join(forecasts)
-
-    async def get_weather_by_city(self, city: str) -> str:
-        """Get weather forecast for a city by name."""
-        city_coords = {
-            "new york": (40.7831, -73.9712),
-            "san francisco": (37.7749, -122.4194),
-            "los angeles": (34.0522, -118.2437),
-            "chicago": (41.8781, -87.6298),
-            "houston": (29.7604, -95.3698),
-            "miami": (25.7617, -80.1918),
-            "seattle": (47.6062, -122.3321),
-            "denver": (39.7392, -104.9903),
-            "atlanta": (33.7490, -84.3880),
-            "boston": (42.3601, -71.0589),
-            "dhaka": (23.8103, 90.4125),
-            "washington": (38.9072, -77.0369),
-            "philadelphia": (39.9526, -75.1652),
-            "phoenix": (33.4484, -112.0740),
-            "las vegas": (36.1699, -115.1398)
-        }
-        
-        city_lower = city.lower().strip()
-        
-        if city_lower in city_coords:
-            lat, lon = city_coords[city_lower]
-            return await self.get_forecast(lat, lon)
-        else:
-            return f"Sorry, I don't have coordinates for '{city}'. Available cities: {', '.join(city_coords.keys())}"
-
-# MCP Server implementation
-class MCPServer:
-    def __init__(self):
-        self.weather = WeatherTools()
-        self.tools = {
-            "get_forecast": {
-                "name": "get_forecast",
-                "description": "Get weather forecast for a location using latitude and longitude coordinates",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "latitude": {"type": "number", "description": "Latitude of the location"},
-                        "longitude": {"type": "number", "description": "Longitude of the location"}
-                    },
-                    "required": ["latitude", "longitude"]
-                }
-            },
-            "get_weather_by_city": {
-                "name": "get_weather_by_city",
-                "description": "Get weather forecast for a city by name (supports major US cities and Dhaka)",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "city": {"type": "string", "description": "Name of the city (e.g., 'New York', 'San Francisco', 'Dhaka')"}
-                    },
-                    "required": ["city"]
-                }
-            },
-            "get_alerts": {
-                "name": "get_alerts",
-                "description": "Get weather alerts for a US state",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "state": {"type": "string", "description": "Two-letter US state code (e.g., 'CA', 'NY')"}
-                    },
-                    "required": ["state"]
-                }
-            }
-        }
-
-    async def handle_request(self, request):
-        method = request.get("method")
-        params = request.get("params", {})
-        
-        if method == "tools/list":
-            return {"tools": list(self.tools.values())}
-        
-        elif method == "tools/call":
-            tool_name = params.get("name")
-            arguments = params.get("arguments", {})
-            
-            if tool_name == "get_forecast":
-                result = await self.weather.get_forecast(arguments["latitude"], arguments["longitude"])
-            elif tool_name == "get_weather_by_city":
-                result = await self.weather.get_weather_by_city(arguments["city"])
-            elif tool_name == "get_alerts":
-                result = await self.weather.get_alerts(arguments["state"])
-            else:
-                return {"error": {"code": -32601, "message": f"Unknown tool: {tool_name}"}}
-            
-            return {"content": [{"type": "text", "text": result}]}
-        
-        else:
-            return {"error": {"code": -32601, "message": f"Unknown method: {method}"}}
-
-async def main():
-    server = MCPServer()
-    
-    while True:
-        try:
-            line = input()
-            if not line.strip():
-                continue
-                
-            request = json.loads(line)
-            result = await server.handle_request(request)
-            
-            response = {
-                "jsonrpc": "2.0",
-                "id": request.get("id"),
-                "result": result
-            }
-            
-            print(json.dumps(response))
-            sys.stdout.flush()
-            
-        except EOFError:
-            break
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": request.get("id") if 'request' in locals() else None,
-                "error": {"code": -32000, "message": str(e)}
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
-
-if __name__ == "__main__":
-    asyncio.run(main())
-`;
-
-      // Write the weather server file
-      await fs.writeFile("weather_server.py", weatherServerCode);
-
-      // Start the weather server process
-      this.weatherServer = spawn("python3", ["weather_server.py"], {
-        stdio: ["pipe", "pipe", "pipe"],
-      });
-
-      // Set up communication handlers
-      this.setupServerCommunication();
+      // Weather and search tools are served by one shared Python process
+      this.toolHost = MCPHostConnection.acquire();
 
       // Initialize tools list with delay
       setTimeout(() => this.listTools(), 1000);
 
-      console.log("Weather MCP server initialized successfully");
+      console.log("MCP tool host initialized successfully");
     } catch (error) {
-      console.error("Failed to initialize weather server:", error);
+      console.error("Failed to initialize MCP tool host:", error);
     }
   }
 
@@ -428,107 +367,44 @@ if __name__ == "__main__":
     }
   }
 
-  private setupServerCommunication() {
-    if (!this.weatherServer) return;
-
-    this.weatherServer.stdout?.on("data", (data) => {
-      const lines = data
-        .toString()
-        .split("\n")
-        .filter((line: string) => line.trim());
-
-      for (const line of lines) {
-        try {
-          const message = JSON.parse(line);
-
-          if (message.id && this.pendingRequests.has(message.id)) {
-            const { resolve, reject } = this.pendingRequests.get(message.id)!;
-            this.pendingRequests.delete(message.id);
-
-            if (message.error) {
-              reject(new Error(message.error.message || "MCP Error"));
-            } else {
-              resolve(message.result);
-            }
-          }
-        } catch (error) {
-          // Ignore parsing errors
-        }
-      }
-    });
-
-    this.weatherServer.stderr?.on("data", (data) => {
-      console.error("Weather server error:", data.toString());
-    });
-  }
-
   // REMOVED: Old search server communication - now using Jina AI tools directly
   // private setupSearchServerCommunication() { ... }
 
-  private async sendMCPRequest(
-    method: string,
-    params: any = {},
-    serverType: "weather" | "search" = "weather",
-  ): Promise<any> {
-    return new Promise((resolve, reject) => {
-      const server =
-        serverType === "weather" ? this.weatherServer : this.searchServer;
-
-      if (!server?.stdin) {
-        reject(new Error(`${serverType} server not available`));
-        return;
-      }
-
-      const id = randomUUID();
-      const request = {
-        jsonrpc: "2.0",
-        id,
-        method,
-        params,
-      };
-
-      this.pendingRequests.set(id, { resolve, reject });
-
-      try {
-        server.stdin.write(JSON.stringify(request) + "\n");
-      } catch (error) {
-        this.pendingRequests.delete(id);
-        reject(error);
-      }
-
-      // Set timeout
-      setTimeout(() => {
-        if (this.pendingRequests.has(id)) {
-          this.pendingRequests.delete(id);
-          reject(new Error(`${serverType} server request timeout`));
-        }
-      }, 45000); // Longer timeout for search operations
-    });
+  private async sendMCPRequest(method: string, params: any = {}, span?: Span, signal?: AbortSignal): Promise<any> {
+    if (!this.toolHost) {
+      throw new Error("MCP tool host not available");
+    }
+    if (span) {
+      // Continue this trace in the tool host's spans
+      params = { ...params, _meta: { ...params._meta, traceparent: span.traceparent } };
+    }
+    return this.toolHost.request(method, params, undefined, signal);
   }
 
   private async listTools(): Promise<void> {
     try {
-      // Get tools from weather server only (keep weather functionality)
-      const [weatherResponse] = await Promise.allSettled([
-        this.sendMCPRequest("tools/list", {}, "weather"),
+      // Get every tool the Python host serves (weather, plus search when configured)
+      const [hostResponse] = await Promise.allSettled([
+        this.sendMCPRequest("tools/list", {}),
       ]);
 
-      // Reset available tools to only include weather tools (if available) plus Jina tools
+      // Reset available tools to only include host tools (if available) plus Jina tools
       this.availableTools = [];
 
-      if (weatherResponse.status === "fulfilled") {
-        this.availableTools.push(...(weatherResponse.value.tools || []));
+      if (hostResponse.status === "fulfilled") {
+        this.availableTools.push(...(hostResponse.value.tools || []));
       }
 
       // Jina tools are already added in initializeJinaTools(), no need to add again
       console.log("Available tools loaded:", this.availableTools.map(t => t.name));
     } catch (error) {
       console.error("Failed to list MCP tools:", error);
-      // Keep Jina tools even if weather server fails
+      // Keep Jina tools even if the tool host fails
     }
   }
 
-  private async callTool(name: string, arguments_: any): Promise<string> {
+  private async callTool(name: string, arguments_: any, parent: Span | null = null, signal?: AbortSignal): Promise<string> {
+    const span = new Span("MCPChatClient.callTool", "client", parent, { "mcp.tool.name": name });
     try {
       // Handle Jina AI tools
       const jinaTools = ["read_url", "capture_screenshot_url", "search_web_jina", "search_arxiv", "search_image_jina", "rerank_jina"];
@@ -536,16 +412,15 @@ if __name__ == "__main__":
         return await this.callJinaTool(name, arguments_);
       }
 
-      // All remaining tools should be weather tools
-      const serverType = "weather";
-
+      // All remaining tools are served by the Python tool host
       const response = await this.sendMCPRequest(
         "tools/call",
         {
           name,
           arguments: arguments_,
         },
-        serverType,
+        span,
+        signal,
       );
 
       if (response.content && response.content[0]) {
@@ -554,7 +429,10 @@ if __name__ == "__main__":
 
       return JSON.stringify(response);
     } catch (error) {
+      span.setError(error instanceof Error ? error.message : String(error));
       return `Error calling tool ${name}: ${error instanceof Error ? error.message : String(error)}`;
+    } finally {
+      span.end();
     }
   }
 
@@ -765,7 +643,10 @@ if __name__ == "__main__":
   async *chatStream(
     messages: ChatMessage[],
     selectedTool?: string | null,
+    signal?: AbortSignal,
   ): AsyncGenerator<StreamChunk> {
+    // One trace per chat turn: the model call plus every tool call it makes
+    const turn = new Span("MCPChatClient.chatStream", "server", null, { "chat.selected_tool": selectedTool || "auto" });
     try {
       // Handle manual tool selection with immediate execution
 
@@ -932,6 +813,8 @@ if __name__ == "__main__":
         },
       }));
 
+      // Ends when the model finishes streaming, before any tool runs
+      const completion = turn.child("deepseek.chat_completions", "client", { "llm.model": this.model });
       const response = await fetch(`${this.apiUrl}/chat/completions`, {
         method: "POST",
         headers: {
@@ -947,9 +830,13 @@ if __name__ == "__main__":
           max_tokens: 2000, // Limit response length to prevent rambling
           temperature: 0.7,
         }),
+        signal,
       });
 
+      completion.setAttribute("http.response.status_code", response.status);
       if (!response.ok) {
+        completion.setError(`HTTP ${response.status}`);
+        completion.end();
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
@@ -1010,6 +897,10 @@ if __name__ == "__main__":
                 }
               }
 
+              if (parsed.choices?.[0]?.finish_reason) {
+                completion.end();
+              }
+
               if (parsed.choices?.[0]?.finish_reason === "tool_calls") {
                 // Process tool calls
                 for (const toolCall of toolCalls) {
@@ -1055,7 +946,7 @@ if __name__ == "__main__":
                     };
                   }
 
-                  const toolResult = await this.callTool(toolName, toolArgs);
+                  const toolResult = await this.callTool(toolName, toolArgs, turn, signal);
 
                   if (
                     toolName === "search_web_jina" ||
@@ -1093,12 +984,16 @@ if __name__ == "__main__":
       }
 
       // Only yield finished if we haven't already returned
+      completion.end();
       yield { finished: true };
     } catch (error) {
+      turn.setError(error instanceof Error ? error.message : String(error));
       yield {
         error:
           error instanceof Error ? error.message : "Unknown error occurred",
       };
+    } finally {
+      turn.end();
     }
   }
 
@@ -1168,13 +1063,9 @@ if __name__ == "__main__":
   }
 
   cleanup() {
-    if (this.weatherServer) {
-      this.weatherServer.kill();
-      this.weatherServer = null;
-    }
-    if (this.searchServer) {
-      this.searchServer.kill();
-      this.searchServer = null;
+    if (this.toolHost) {
+      this.toolHost.release();
+      this.toolHost = null;
     }
   }
 }
@@ -307,9 +307,16 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
       let assistantResponse = '';
 
+      // If the browser goes away mid-answer, stop the model call and cancel
+      // any tool call still running in the tool host.
+      const aborter = new AbortController();
+      res.on('close', () => {
+        if (!res.writableFinished) aborter.abort();
+      });
+
       try {
         // Stream response from MCP client with tool selection
-        for await (const chunk of mcpClient.chatStream(chatMessages, selectedTool)) {
+        for await (const chunk of mcpClient.chatStream(chatMessages, selectedTool, aborter.signal)) {
           if (chunk.error) {
             res.write(`data: ${JSON.stringify({ error: chunk.error })}\n\n`);
             break;
@@ -0,0 +1,108 @@
+import { randomBytes } from "crypto";
+import { appendFile } from "fs";
+
+// Spans go to the same JSONL file as the Python tool host's, one OTLP/JSON
+// ExportTraceServiceRequest per line, so a collector (or a script) can join
+// a chat turn with the tool calls it made. Tracing is off unless
+// MCP_TRACE_FILE is set; spans are still created so trace context is passed on.
+const TRACE_FILE = process.env.MCP_TRACE_FILE;
+const SERVICE_NAME = "beebot-server";
+
+export type SpanKind = "internal" | "server" | "client";
+const SPAN_KINDS: Record<SpanKind, number> = { internal: 1, server: 2, client: 3 };
+const STATUS_ERROR = 2;
+
+type AttributeValue = string | number | boolean;
+
+// Wall-clock nanoseconds with hrtime resolution.
+const ORIGIN_NS = BigInt(Date.now()) * BigInt(1000000) - process.hrtime.bigint();
+const nowNs = () => ORIGIN_NS + process.hrtime.bigint();
+
+let buffered: Span[] = [];
+
+export class Span {
+  readonly traceId: string;
+  readonly spanId = randomBytes(8).toString("hex");
+  private readonly startNs = nowNs();
+  private endNs: bigint | null = null;
+  private attributes: Record<string, AttributeValue>;
+  private error: string | null = null;
+
+  constructor(
+    readonly name: string,
+    readonly kind: SpanKind = "internal",
+    readonly parent: Span | null = null,
+    attributes: Record<string, AttributeValue> = {},
+  ) {
+    this.traceId = parent?.traceId ?? randomBytes(16).toString("hex");
+    this.attributes = { ...attributes };
+  }
+
+  // W3C trace context, sent to the tool host in params._meta.
+  get traceparent(): string {
+    return `00-${this.traceId}-${this.spanId}-01`;
+  }
+
+  child(name: string, kind: SpanKind = "internal", attributes: Record<string, AttributeValue> = {}): Span {
+    return new Span(name, kind, this, attributes);
+  }
+
+  setAttribute(key: string, value: AttributeValue) {
+    this.attributes[key] = value;
+  }
+
+  setError(message: string) {
+    this.error = message;
+  }
+
+  end() {
+    if (this.endNs !== null) return;
+    this.endNs = nowNs();
+    if (!TRACE_FILE) return;
+    buffered.push(this);
+    if (!this.parent) flush();
+  }
+
+  toOTLP() {
+    return {
+      traceId: this.traceId,
+      spanId: this.spanId,
+      ...(this.parent ? { parentSpanId: this.parent.spanId } : {}),
+      name: this.name,
+      kind: SPAN_KINDS[this.kind],
+      startTimeUnixNano: this.startNs.toString(),
+      endTimeUnixNano: (this.endNs ?? nowNs()).toString(),
+      attributes: Object.entries(this.attributes).map(([key, value]) => ({
+        key,
+        value:
+          typeof value === "boolean"
+            ? { boolValue: value }
+            : typeof value === "number"
+              ? Number.isInteger(value)
+                ? { intValue: String(value) }
+                : { doubleValue: value }
+              : { stringValue: value },
+      })),
+      status: this.error === null ? {} : { code: STATUS_ERROR, message: this.error },
+    };
+  }
+}
+
+function flush() {
+  if (!TRACE_FILE || buffered.length === 0) return;
+  const spans = buffered;
+  buffered = [];
+  const line = JSON.stringify({
+    resourceSpans: [
+      {
+        resource: {
+          attributes: [{ key: "service.name", value: { stringValue: SERVICE_NAME } }],
+        },
+        scopeSpans: [{ scope: { name: "server/tracing" }, spans: spans.map((span) => span.toOTLP()) }],
+      },
+    ],
+  });
+  appendFile(TRACE_FILE, line + "\n", (error) => {
+    if (error) console.error("Failed to write trace spans:", error);
+  });
+}
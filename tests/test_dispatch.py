@@ -0,0 +1,169 @@
+import asyncio
+import json
+
+from mcp_common import Dispatcher, Metrics
+from mcp_common import dispatch
+from mcp_common.dispatch import REQUEST_TIMEOUT
+
+
+class FakeServer:
+    """Answers every request with its id once ``release`` is set."""
+
+    def __init__(self):
+        self.metrics = Metrics()
+        self.release = asyncio.Event()
+        self.started = []
+
+    async def handle_request(self, request):
+        self.started.append(request["id"])
+        await self.release.wait()
+        return {"echo": request["id"]}
+
+
+def call(request_id, tool="slow", meta=None):
+    params = {"name": tool, "arguments": {}}
+    if meta:
+        params["_meta"] = meta
+    return json.dumps({"jsonrpc": "2.0", "id": request_id,
+                       "method": "tools/call", "params": params})
+
+
+def cancel(request_id):
+    return json.dumps({"jsonrpc": "2.0", "method": "notifications/cancelled",
+                       "params": {"requestId": request_id}})
+
+
+def counter(metrics, name, **labels):
+    return sum(value for (key, series), value in metrics.counters.items()
+               if key == name and labels.items() <= dict(series).items())
+
+
+def make_dispatcher(max_concurrency=4):
+    server = FakeServer()
+    replies = []
+
+    async def send(message):
+        replies.append(message)
+
+    return server, replies, Dispatcher(server, send, max_concurrency)
+
+
+def test_cancel_before_the_task_starts_is_counted_once(monkeypatch):
+    finished = []
+    finish = dispatch.tracer.finish
+    monkeypatch.setattr(dispatch.tracer, "finish",
+                        lambda span: finished.append(span) or finish(span))
+
+    async def main():
+        server, replies, dispatcher = make_dispatcher()
+        # Both lines arrive together, so the task never gets to run.
+        await dispatcher.submit(call(1))
+        await dispatcher.submit(cancel(1))
+        await dispatcher.drain()
+        return server, replies
+
+    server, replies = asyncio.run(main())
+    assert replies == []
+    assert server.started == []
+    metrics = server.metrics
+    assert counter(metrics, "requests_cancelled_total", reason="client",
+                   tool="slow") == 1
+    assert counter(metrics, "tool_calls_total", status="cancelled",
+                   tool="slow") == 1
+    roots = [span for span in finished if span.local_root]
+    assert len(roots) == 1 and roots[0].end_ns is not None
+
+
+def test_cancel_reaches_a_request_waiting_for_a_slot():
+
+    async def main():
+        server, replies, dispatcher = make_dispatcher(max_concurrency=1)
+        await dispatcher.submit(call(1))
+        await asyncio.sleep(0)
+        # The only slot is taken; reading must go on regardless.
+        await asyncio.wait_for(dispatcher.submit(call(2)), 1)
+        await asyncio.wait_for(dispatcher.submit(cancel(2)), 1)
+        await asyncio.sleep(0)
+        server.release.set()
+        await dispatcher.drain()
+        return server, replies
+
+    server, replies = asyncio.run(main())
+    assert [reply["id"] for reply in replies] == [1]
+    assert server.started == [1]
+    assert counter(server.metrics, "requests_cancelled_total",
+                   reason="client") == 1
+
+
+def test_cancel_while_running_is_left_to_the_handler_to_count():
+
+    async def main():
+        server, replies, dispatcher = make_dispatcher()
+        await dispatcher.submit(call(1))
+        await asyncio.sleep(0)
+        await dispatcher.submit(cancel(1))
+        await dispatcher.drain()
+        return server, replies
+
+    server, replies = asyncio.run(main())
+    assert replies == []
+    assert server.started == [1]
+    assert counter(server.metrics, "requests_cancelled_total",
+                   reason="client") == 1
+    # A handler that ran counts its own tool call.
+    assert counter(server.metrics, "tool_calls_total") == 0
+
+
+def test_deadline_counts_time_spent_waiting_for_a_slot():
+
+    async def main():
+        server, replies, dispatcher = make_dispatcher(max_concurrency=1)
+        await dispatcher.submit(call(1))
+        await dispatcher.submit(call(2, meta={"timeoutMs": 50}))
+        await asyncio.sleep(0.2)
+        server.release.set()
+        await dispatcher.drain()
+        return server, replies
+
+    server, replies = asyncio.run(main())
+    by_id = {reply["id"]: reply for reply in replies}
+    assert by_id[2]["error"]["code"] == REQUEST_TIMEOUT
+    assert by_id[1]["result"] == {"echo": 1}
+    assert server.started == [1]
+    assert counter(server.metrics, "requests_cancelled_total",
+                   reason="deadline") == 1
+
+
+def test_requests_past_the_queue_limit_are_rejected():
+
+    async def main():
+        server = FakeServer()
+        replies = []
+
+        async def send(message):
+            replies.append(message)
+
+        dispatcher = Dispatcher(server, send, max_concurrency=1, max_queued=1)
+        for request_id in (1, 2, 3):
+            await dispatcher.submit(call(request_id))
+        server.release.set()
+        await dispatcher.drain()
+        return replies
+
+    replies = asyncio.run(main())
+    by_id = {reply["id"]: reply for reply in replies}
+    assert by_id[3]["error"]["message"] == "Server busy"
+    assert "result" in by_id[1] and "result" in by_id[2]
+
+
+def test_notifications_get_no_reply():
+
+    async def main():
+        server, replies, dispatcher = make_dispatcher()
+        await dispatcher.submit(json.dumps(
+            {"jsonrpc": "2.0", "method": "notifications/initialized"}))
+        await dispatcher.submit(cancel("unknown"))
+        await dispatcher.drain()
+        return replies
+
+    assert asyncio.run(main()) == []
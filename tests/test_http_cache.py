@@ -0,0 +1,38 @@
+from mcp_common.http_cache import HTTPResponseCache, freshness_lifetime
+
+
+def test_max_age_minus_age():
+    assert freshness_lifetime({"Cache-Control": "max-age=60",
+                               "Age": "20"}) == 40
+
+
+def test_private_responses_are_stored():
+    assert freshness_lifetime({"Cache-Control": "private, max-age=30"}) == 30
+
+
+def test_s_maxage_is_ignored():
+    headers = {"Cache-Control": "s-maxage=600, max-age=10"}
+    assert freshness_lifetime(headers) == 10
+
+
+def test_no_store_and_no_cache():
+    assert freshness_lifetime({"Cache-Control": "no-store"}) is None
+    assert freshness_lifetime({"Cache-Control": "no-cache, max-age=60"}) == 0
+
+
+def test_expires_is_relative_to_date():
+    headers = {"Date": "Sat, 17 Oct 2026 10:00:00 GMT",
+               "Expires": "Sat, 17 Oct 2026 10:05:00 GMT"}
+    assert freshness_lifetime(headers) == 300
+
+
+def test_stale_entry_with_validator_is_revalidated():
+    cache = HTTPResponseCache()
+    cache.store("u", {"Cache-Control": "max-age=0", "ETag": '"v1"'},
+                {"body": 1})
+    entry, fresh = cache.lookup("u", "points")
+    assert not fresh
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+    body = cache.refresh("u", entry, "points", {"Cache-Control": "max-age=60"})
+    assert body == {"body": 1}
+    assert cache.lookup("u", "points")[1]
@@ -0,0 +1,35 @@
+from mcp_common.neardup import (FingerprintStore, merge_near_duplicates,
+                                minhash, similarity)
+
+ARTICLE = ("The city council approved a new budget on Tuesday that raises "
+           "spending on public transit, parks and road repairs while "
+           "keeping property taxes flat for the third year in a row.")
+
+
+def test_similarity_of_near_copies():
+    copy = ARTICLE.replace("Tuesday", "Wednesday")
+    other = ("A rare comet will be visible to the naked eye next week, "
+             "astronomers said, weather permitting, shortly after sunset.")
+    assert similarity(minhash(ARTICLE), minhash(copy)) > 0.7
+    assert similarity(minhash(ARTICLE), minhash(other)) < 0.2
+
+
+def test_merge_keeps_first_and_collects_urls_across_calls():
+    store = FingerprintStore()
+    first = merge_near_duplicates(
+        [{"url": "a", "title": "Budget", "summary": ARTICLE},
+         {"url": "b", "title": "Budget", "summary": ARTICLE + " Updated."}],
+        store)
+    assert [item["url"] for item in first] == ["a"]
+    assert first[0]["urls"] == ["a", "b"]
+
+    later = merge_near_duplicates(
+        [{"url": "c", "title": "Budget", "summary": ARTICLE}], store)
+    assert later[0]["urls"] == ["c", "a", "b"]
+
+
+def test_short_text_is_never_merged():
+    items = [{"url": "a", "title": "", "summary": ""},
+             {"url": "b", "title": "", "summary": ""}]
+    merged = merge_near_duplicates(items, FingerprintStore())
+    assert [item["urls"] for item in merged] == [["a"], ["b"]]
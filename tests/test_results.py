@@ -0,0 +1,89 @@
+from mcp_common.results import ToolResult, fit_budget
+
+TRIM = [("items", ("text", ))]
+
+
+def render(data):
+    lines = [f"{item['title']}: {item['text']}" for item in data["items"]]
+    return "\n".join(lines) if lines else "Nothing found."
+
+
+def items(count, text_chars=40):
+    return [{"title": f"Item {i}", "text": "x" * text_chars}
+            for i in range(count)]
+
+
+def test_fitting_output_is_untouched():
+    data = {"items": items(2)}
+    trimmed, text = fit_budget(data, render, TRIM, 10_000)
+    assert trimmed is data
+    assert text == render(data)
+
+
+def test_empty_list_is_not_reported_as_dropped():
+    data = {"header": "h" * 500, "items": []}
+    trimmed, text = fit_budget(data, lambda d: d["header"], TRIM, 100)
+    assert len(text) <= 100
+    assert trimmed["truncated"]["dropped"] == 0
+    assert trimmed["truncated"]["of"] == 0
+
+
+def test_note_only_reserves_the_room_it_needs():
+    # Ten 49-character lines; the note is about 130 characters, so five
+    # lines fit in 400 next to it.
+    data = {"items": items(10)}
+    trimmed, text = fit_budget(data, render, TRIM, 400)
+    assert len(text) <= 400
+    assert len(trimmed["items"]) == 5
+    assert "5 of 10 items dropped" in text
+
+
+def test_budget_smaller_than_one_item_keeps_the_top_item_shortened():
+    data = {"items": items(3, text_chars=2000)}
+    trimmed, text = fit_budget(data, render, TRIM, 300)
+    assert len(text) <= 300
+    assert [item["title"] for item in trimmed["items"]] == ["Item 0"]
+    assert trimmed["truncated"] == {
+        "shortened": 1,
+        "dropped": 2,
+        "of": 3,
+        "omitted_chars": trimmed["truncated"]["omitted_chars"]
+    }
+    assert text.startswith("Item 0: xxx")
+
+
+def test_output_never_exceeds_the_budget():
+    data = {"items": items(6, text_chars=300)}
+    for max_chars in range(0, 2500, 7):
+        _, text = fit_budget(data, render, TRIM, max_chars)
+        assert len(text) <= max_chars
+
+
+def test_renderer_sees_that_items_were_dropped():
+    seen = []
+
+    def record(data):
+        seen.append(data.get("truncated", {}).get("dropped", 0))
+        return render(data)
+
+    # Too small for even a shortened item, so all four go.
+    trimmed, _ = fit_budget({"items": items(4, text_chars=500)}, record,
+                            TRIM, 8)
+    assert trimmed["items"] == []
+    assert seen[-1] == 4
+
+
+def test_structured_reply_trims_the_data_but_not_to_text():
+    result = ToolResult({"items": items(20, text_chars=400)}, render,
+                        trim=TRIM)
+    reply = result.reply("structured", max_chars=2000)
+    data = reply["structuredContent"]
+    assert data["truncated"]["dropped"] > 0
+    assert reply["content"][0]["text"].startswith("Result in structuredContent")
+
+
+def test_with_data_leaves_the_original_alone():
+    result = ToolResult({"query": "First", "items": []}, render)
+    copy = result.with_data(query="first")
+    assert copy.data["query"] == "first"
+    assert result.data["query"] == "First"
@@ -0,0 +1,41 @@
+import pytest
+
+from mcp_common.results import fit_budget
+from weather_server import WeatherTools
+
+TRIM = [("alerts", ("description", "instruction"))]
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    monkeypatch.setenv("NWS_POINTS_CACHE_PATH", str(tmp_path / "points.json"))
+    return WeatherTools()
+
+
+def alert(number, state="TX"):
+    return {"event": f"Flood Warning {number}", "area": "Harris County",
+            "severity": "Severe", "description": "Heavy rain. " * 100,
+            "instruction": "Move to higher ground. " * 10, "states": [state]}
+
+
+def test_trimmed_alerts_keep_at_least_the_first(tools):
+    data = {"state": "TX", "alerts": [alert(i) for i in range(4)]}
+    trimmed, text = fit_budget(data, tools.format_alerts, TRIM, 600)
+    assert len(text) <= 600
+    assert "Flood Warning 0" in text
+    assert trimmed["truncated"]["dropped"] == 3
+
+
+def test_dropped_alerts_are_not_reported_as_none(tools):
+    data = {"state": "TX", "alerts": [alert(i) for i in range(4)]}
+    _, text = fit_budget(data, tools.format_alerts, TRIM, 70)
+    assert "No active alerts" not in text
+    assert "omitted" in text
+
+
+def test_regional_states_without_alerts_still_say_so(tools):
+    data = {"states": ["TX", "OK"], "alerts": [alert(0)]}
+    assert "## OK\nNo active alerts for this state." in (
+        tools.format_regional_alerts(data))
+    _, text = fit_budget(data, tools.format_regional_alerts, TRIM, 60)
+    assert "No active alerts" not in text
@@ -1,41 +1,435 @@
 #!/usr/bin/env python3
-import json
-import sys
 import asyncio
-import httpx
-from typing import Any, Dict
+import importlib.util
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Dict, List
+from urllib.parse import urlsplit
+
+from mcp_common import serve
+from mcp_common.cache import PersistentTTLCache
+from mcp_common.gazetteer import Gazetteer
+from mcp_common.gridindex import GridCellIndex
+from mcp_common.http_cache import HTTPResponseCache
+from mcp_common.metrics import Metrics, Sample, cache_samples
+from mcp_common.metrics import metrics as default_metrics
+from mcp_common.registry import MCPHost, ToolRegistry
+from mcp_common.resilience import (CircuitBreaker, LatencyWindow, RetryPolicy,
+                                   hedge)
+from mcp_common.results import ToolResult, compact
+from mcp_common.singleflight import SingleFlight, coalesce
+from mcp_common.tracing import tracer
+
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_POINTS_CACHE_PATH = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "beebot",
+    "nws_points.json")
+
+US_REGIONS = {
+    "northeast": ["CT", "ME", "MA", "NH", "RI", "VT", "NJ", "NY", "PA"],
+    "midwest": ["IL", "IN", "MI", "OH", "WI", "IA", "KS", "MN", "MO", "NE",
+                "ND", "SD"],
+    "south": ["DE", "DC", "FL", "GA", "MD", "NC", "SC", "VA", "WV", "AL",
+              "KY", "MS", "TN", "AR", "LA", "OK", "TX"],
+    "west": ["AZ", "CO", "ID", "MT", "NV", "NM", "UT", "WY", "AK", "CA",
+             "HI", "OR", "WA"]
+}
+
+STATE_CODE = re.compile(r"^[A-Z]{2}$")
+# UGC prefixes of NWS marine zones (coastal waters, Great Lakes, offshore),
+# e.g. PZZ530 or ANZ335. Regional alerts for these zones only are grouped
+# under MARINE_GROUP rather than attributed to a state.
+MARINE_PREFIXES = frozenset({"AM", "AN", "GM", "LC", "LE", "LH", "LM", "LO",
+                             "LS", "PH", "PK", "PM", "PS", "PZ", "SL"})
+MARINE_GROUP = "marine"
+
 
 # Weather tools implementation
 class WeatherTools:
     NWS_API_BASE = "https://api.weather.gov"
     USER_AGENT = "weather-app/1.0"
-    
-    async def make_nws_request(self, url: str) -> Dict[str, Any] | None:
-        """Make a request to the NWS API with proper error handling."""
-        headers = {
-            "User-Agent": self.USER_AGENT,
-            "Accept": "application/geo+json"
+
+    def __init__(self,
+                 max_connections: int | None = None,
+                 max_keepalive_connections: int | None = None,
+                 connect_timeout: float | None = None,
+                 read_timeout: float | None = None,
+                 http2: bool | None = None,
+                 metrics: Metrics | None = None):
+        self.max_connections = max_connections or int(
+            os.getenv("NWS_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.getenv("NWS_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        self.connect_timeout = connect_timeout or float(
+            os.getenv("NWS_CONNECT_TIMEOUT", "5"))
+        self.read_timeout = read_timeout or float(
+            os.getenv("NWS_READ_TIMEOUT", "10"))
+        if http2 is None:
+            http2 = os.getenv("NWS_HTTP2", "1") != "0"
+        # HTTP/2 needs the optional h2 package (httpx[http2]).
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._client: "httpx.AsyncClient | None" = None
+        self.connection_stats = {"requests": 0, "new_connections": 0}
+        self.metrics = metrics or default_metrics
+        self.batch_concurrency = int(os.getenv("NWS_BATCH_CONCURRENCY", "8"))
+        self.max_batch_locations = int(
+            os.getenv("NWS_MAX_BATCH_LOCATIONS", "50"))
+        self.flights = SingleFlight()
+        self.gazetteer = Gazetteer()
+        self.grid_index = GridCellIndex()
+        self.response_cache = HTTPResponseCache(
+            max_entries=int(os.getenv("NWS_RESPONSE_CACHE_SIZE", "1000")))
+
+        # Upstream resilience: retry transient failures, hedge slow requests
+        # past the endpoint's recent p95, and stop calling a host (serving
+        # stale cache where we have it) after repeated failures.
+        self.retry = RetryPolicy(
+            attempts=int(os.getenv("NWS_RETRY_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("NWS_RETRY_BASE_DELAY", "0.25")),
+            max_delay=float(os.getenv("NWS_RETRY_MAX_DELAY", "4")))
+        self.hedging = os.getenv("NWS_HEDGE", "1") != "0"
+        self.hedge_max_ratio = float(os.getenv("NWS_HEDGE_MAX_RATIO", "0.1"))
+        self.hedge_min_delay = float(os.getenv("NWS_HEDGE_MIN_DELAY", "0.05"))
+        self.hedge_stats = {"requests": 0, "hedges": 0}
+        self.latencies: Dict[str, LatencyWindow] = defaultdict(LatencyWindow)
+        self.breaker_failures = int(os.getenv("NWS_BREAKER_FAILURES", "5"))
+        self.breaker_reset = float(os.getenv("NWS_BREAKER_RESET", "30"))
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.points_cache = PersistentTTLCache(
+            os.getenv("NWS_POINTS_CACHE_PATH", DEFAULT_POINTS_CACHE_PATH),
+            max_entries=int(os.getenv("NWS_POINTS_CACHE_SIZE", "5000")),
+            ttl=float(os.getenv("NWS_POINTS_CACHE_TTL", 30 * 24 * 3600)))
+
+    def get_client(self) -> "httpx.AsyncClient":
+        """Return the shared client, creating it on first use.
+
+        httpx is imported here rather than at module load, so the server can
+        answer initialize and tools/list before paying for the network stack.
+        """
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                headers={
+                    "User-Agent": self.USER_AGENT,
+                    "Accept": "application/geo+json"
+                },
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections),
+                timeout=httpx.Timeout(self.read_timeout,
+                                      connect=self.connect_timeout))
+        return self._client
+
+    def warm_up(self) -> None:
+        """Import the HTTP stack and open the gazetteer ahead of first use."""
+        import httpx  # noqa: F401
+        self.gazetteer.open()
+
+    async def aclose(self):
+        """Close pooled connections and persist the points cache."""
+        self.points_cache.save()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def connection_reuse(self) -> Dict[str, Any]:
+        """Report how many requests went out on an already-open connection."""
+        requests = self.connection_stats["requests"]
+        new = self.connection_stats["new_connections"]
+        return {
+            "requests": requests,
+            "new_connections": new,
+            "reused_connections": max(0, requests - new),
+            "reuse_ratio": (requests - new) / requests if requests else 0.0
         }
-        async with httpx.AsyncClient() as client:
+
+    def collect_metrics(self) -> List[Sample]:
+        """Cache and connection-reuse figures for the metrics endpoint."""
+        samples = []
+        for endpoint, stats in self.response_cache.stats.items():
+            cache = f"nws_{endpoint}"
+            samples += cache_samples(cache, stats["hits"],
+                                     stats["misses"] + stats["revalidations"])
+            samples += [
+                ("cache_revalidations", {"cache": cache},
+                 stats["revalidations"]),
+                ("cache_not_modified", {"cache": cache}, stats["not_modified"])
+            ]
+        samples += cache_samples("nws_points_lookup", self.points_cache.hits,
+                                 self.points_cache.misses)
+        samples += cache_samples("nws_grid_index", self.grid_index.hits,
+                                 self.grid_index.misses)
+        for host, breaker in self.breakers.items():
+            samples += [
+                ("circuit_state", {"host": host},
+                 CircuitBreaker.STATE_VALUES[breaker.state]),
+                ("circuit_opened", {"host": host}, breaker.opened)
+            ]
+        for endpoint in self.latencies:
+            delay = self.hedge_delay(endpoint)
+            if delay is not None:
+                samples.append(
+                    ("hedge_delay_seconds", {"endpoint": endpoint}, delay))
+        reuse = self.connection_reuse()
+        samples += [
+            ("connections_opened", {"upstream": "nws"},
+             reuse["new_connections"]),
+            ("connection_reuse_ratio", {"upstream": "nws"},
+             reuse["reuse_ratio"]),
+            ("coalesced_calls", {"provider": "weather"}, self.flights.shared)
+        ]
+        return samples
+
+    async def _trace_connection(self, event: str, info: dict):
+        if event == "connection.connect_tcp.started":
+            self.connection_stats["new_connections"] += 1
+
+    @staticmethod
+    def nws_endpoint(url: str) -> str:
+        """Classify an NWS URL for per-endpoint statistics."""
+        path = urlsplit(url).path
+        if path.startswith("/points/"):
+            return "points"
+        if path.startswith("/alerts"):
+            return "alerts"
+        if path.endswith("/forecast/hourly"):
+            return "forecast_hourly"
+        if path.endswith("/forecast"):
+            return "forecast"
+        if path.startswith("/gridpoints/"):
+            return "gridpoints"
+        return "other"
+
+    @staticmethod
+    def failure_cause(error: Exception) -> str:
+        """Short label for why an NWS request failed."""
+        import httpx
+        if isinstance(error, httpx.HTTPStatusError):
+            return f"http_{error.response.status_code}"
+        if isinstance(error, httpx.TimeoutException):
+            return "timeout"
+        if isinstance(error, httpx.TransportError):
+            return "connection"
+        if isinstance(error, ValueError):
+            return "invalid_json"
+        return type(error).__name__
+
+    def is_transient(self, error: Exception) -> bool:
+        """Whether a failure says the host is unhealthy, not the request."""
+        import httpx
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.retry.statuses
+        return isinstance(error, httpx.TransportError)
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(
+                self.breaker_failures, self.breaker_reset)
+        return breaker
+
+    def hedge_delay(self, endpoint: str) -> float | None:
+        """How long to wait before hedging, or None to not hedge.
+
+        The endpoint's recent p95 latency, so about one request in twenty
+        is hedged; none until enough latencies have been seen.
+        """
+        p95 = self.latencies[endpoint].quantile(0.95)
+        if not self.hedging or p95 is None:
+            return None
+        return max(self.hedge_min_delay, p95)
+
+    async def make_nws_request(self, url: str) -> Dict[str, Any] | None:
+        """Make a request to the NWS API with proper error handling.
+
+        Responses are cached according to their Cache-Control/Expires headers
+        and revalidated with ETag/Last-Modified once stale. Transient
+        failures are retried (see ``get_with_retries``); while the host's
+        circuit is open no request is sent. Either way a failed request
+        falls back to the last cached body if there is one, else returns
+        None; failures are logged and counted by cause in
+        ``upstream_errors``.
+        """
+        endpoint = self.nws_endpoint(url)
+        cached, fresh = self.response_cache.lookup(url, endpoint)
+        if fresh:
+            return cached["body"]
+
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            return self.request_failed(url, endpoint, "circuit_open")
+
+        headers = self.response_cache.conditional_headers(cached) if cached else {}
+        try:
+            response = await self.get_with_retries(url, headers, endpoint)
+            if response.status_code == 304 and cached is not None:
+                breaker.record_success()
+                return self.response_cache.refresh(url, cached, endpoint,
+                                                   response.headers)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            # Only failures that say the host is unhealthy trip the breaker
+            # or justify serving stale data; a 404 is an answer.
+            transient = self.is_transient(e)
+            if transient:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return self.request_failed(url, endpoint, self.failure_cause(e),
+                                       serve_stale=transient)
+
+        breaker.record_success()
+        self.response_cache.store(url, response.headers, data)
+        return data
+
+    def request_failed(self, url: str, endpoint: str, cause: str,
+                       serve_stale: bool = True) -> Dict[str, Any] | None:
+        """Count a failed request; return a stale cached body if we have one."""
+        self.metrics.inc("upstream_errors_total", upstream="nws",
+                         endpoint=endpoint, cause=cause)
+        stale = self.response_cache.stale(url) if serve_stale else None
+        if stale is not None:
+            self.metrics.inc("upstream_stale_served_total", upstream="nws",
+                             endpoint=endpoint)
+        print(f"NWS request failed ({cause}"
+              f"{', serving stale copy' if stale is not None else ''}): {url}",
+              file=sys.stderr)
+        return stale
+
+    async def get_with_retries(self, url: str, headers: Dict[str, str],
+                               endpoint: str) -> "httpx.Response":
+        """GET ``url``, retrying retryable statuses and transport errors.
+
+        The last attempt's response is returned even if it is an error
+        status; the last attempt's exception is raised.
+        """
+        for attempt in range(self.retry.attempts):
+            last = attempt == self.retry.attempts - 1
             try:
-                response = await client.get(url, headers=headers, timeout=30.0)
-                response.raise_for_status()
-                return response.json()
-            except Exception:
-                return None
-
-    def format_alert(self, feature: dict) -> str:
-        """Format an alert feature into a readable string."""
+                response = await self.hedged_get(url, headers, endpoint)
+            except Exception as e:
+                if last or not self.is_transient(e):
+                    raise
+                cause = self.failure_cause(e)
+                delay = self.retry.backoff(attempt)
+            else:
+                if last or response.status_code not in self.retry.statuses:
+                    return response
+                cause = f"http_{response.status_code}"
+                delay = self.retry.backoff(attempt,
+                                           response.headers.get("Retry-After"))
+            self.metrics.inc("upstream_retries_total", upstream="nws",
+                             endpoint=endpoint, cause=cause)
+            await asyncio.sleep(delay)
+
+    async def hedged_get(self, url: str, headers: Dict[str, str],
+                         endpoint: str) -> "httpx.Response":
+        """GET ``url``, sending a second copy if the first is slow.
+
+        Hedges are capped at ``hedge_max_ratio`` of requests so a slow
+        upstream does not get twice the load.
+        """
+        self.hedge_stats["requests"] += 1
+        delay = self.hedge_delay(endpoint)
+        if self.hedge_stats["hedges"] >= (self.hedge_max_ratio *
+                                          self.hedge_stats["requests"]):
+            delay = None
+        copies = 0
+
+        def send():
+            nonlocal copies
+            copies += 1
+            if copies > 1:
+                self.hedge_stats["hedges"] += 1
+                self.metrics.inc("upstream_hedges_total", upstream="nws",
+                                 endpoint=endpoint)
+            return self.fetch(url, headers, endpoint, hedged=copies > 1)
+
+        response, winner = await hedge(send, delay)
+        if winner:
+            self.metrics.inc("upstream_hedges_won_total", upstream="nws",
+                             endpoint=endpoint)
+        return response
+
+    async def fetch(self, url: str, headers: Dict[str, str], endpoint: str,
+                    hedged: bool = False) -> "httpx.Response":
+        """Send one GET and record its latency, span and metrics."""
+        client = self.get_client()
+        self.connection_stats["requests"] += 1
+        with tracer.span(f"GET nws {endpoint}", "client", {
+                "http.request.method": "GET",
+                "url.full": url,
+                "nws.revalidation": "If-None-Match" in headers
+                or "If-Modified-Since" in headers,
+                "nws.hedge": hedged
+        }) as span:
+            start = time.perf_counter()
+            try:
+                with self.metrics.in_flight("upstream_in_flight",
+                                            upstream="nws"):
+                    response = await client.get(
+                        url, headers=headers,
+                        extensions={"trace": self._trace_connection})
+            except asyncio.CancelledError:
+                # The caller was cancelled or this copy lost a hedge race;
+                # httpx closes the connection's stream.
+                self.metrics.inc("upstream_cancelled_total", upstream="nws",
+                                 endpoint=endpoint)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self.metrics.observe("upstream_duration_seconds", elapsed,
+                                     upstream="nws", endpoint=endpoint)
+                self.metrics.inc("upstream_requests_total", upstream="nws",
+                                 endpoint=endpoint)
+            span.set_attribute("http.response.status_code",
+                               response.status_code)
+            if response.status_code >= 500:
+                span.set_error(f"HTTP {response.status_code}")
+            else:
+                self.latencies[endpoint].add(elapsed)
+            return response
+
+    @staticmethod
+    def alert_data(feature: dict) -> Dict[str, Any]:
+        """Extract the fields we report from an alert feature."""
         props = feature["properties"]
+        return compact({
+            "id": feature.get("id") or props.get("id"),
+            "event": props.get("event"),
+            "area": props.get("areaDesc"),
+            "severity": props.get("severity"),
+            "description": props.get("description"),
+            "instruction": props.get("instruction")
+        })
+
+    def format_alert(self, alert: Dict[str, Any]) -> str:
+        """Format an alert into a readable string."""
         return f"""
-Event: {props.get('event', 'Unknown')}
-Area: {props.get('areaDesc', 'Unknown')}
-Severity: {props.get('severity', 'Unknown')}
-Description: {props.get('description', 'No description available')}
-Instructions: {props.get('instruction', 'No specific instructions provided')}
+Event: {alert.get('event', 'Unknown')}
+Area: {alert.get('area', 'Unknown')}
+Severity: {alert.get('severity', 'Unknown')}
+Description: {alert.get('description', 'No description available')}
+Instructions: {alert.get('instruction', 'No specific instructions provided')}
 """
 
-    async def get_alerts(self, state: str) -> str:
+    def format_alerts(self, data: Dict[str, Any]) -> str:
+        if not data["alerts"]:
+            if data.get("truncated", {}).get("dropped"):
+                return "Active alerts were omitted to fit the output size limit."
+            return "No active alerts for this state."
+        return "\n---\n".join(self.format_alert(a) for a in data["alerts"])
+
+    @coalesce
+    async def get_alerts(self, state: str) -> ToolResult | str:
         """Get weather alerts for a US state."""
         url = f"{self.NWS_API_BASE}/alerts/active/area/{state}"
         data = await self.make_nws_request(url)
@@ -43,29 +437,271 @@ Instructions: {props.get('instruction', 'No specific instructions provided')}
         if not data or "features" not in data:
             return "Unable to fetch alerts or no alerts found."
 
-        if not data["features"]:
-            return "No active alerts for this state."
+        alerts = [self.alert_data(feature) for feature in data["features"]]
+        return ToolResult({"state": state, "alerts": alerts},
+                          self.format_alerts,
+                          trim=[("alerts", ("description", "instruction"))])
 
-        alerts = [self.format_alert(feature) for feature in data["features"]]
-        return "\n---\n".join(alerts)
+    @coalesce
+    async def get_regional_alerts(self, states: list[str] | str | None = None,
+                                  region: str | None = None) -> ToolResult | str:
+        """Get weather alerts for several US states in one request.
 
-    async def get_forecast(self, latitude: float, longitude: float) -> str:
-        """Get weather forecast for a location."""
-        points_url = f"{self.NWS_API_BASE}/points/{latitude},{longitude}"
-        points_data = await self.make_nws_request(points_url)
+        ``states`` is a list of two-letter codes or a comma-separated string.
+        Alerts that cover more than one of the states are shown once, under
+        the first state they affect, and referenced from the others; alerts
+        for marine zones only are grouped on their own.
+        """
+        if isinstance(states, str):
+            states = states.split(",")
+        wanted = [str(code).strip().upper() for code in states or []]
+        wanted = [code for code in wanted if code]
+        invalid = [code for code in wanted if not STATE_CODE.match(code)]
+        if invalid:
+            return (f"Invalid state code(s): {', '.join(invalid)}. Use "
+                    f"two-letter codes such as CA or NY.")
+        if region:
+            region_states = US_REGIONS.get(region.strip().lower())
+            if region_states is None:
+                return (f"Unknown region '{region}'. Available regions: "
+                        f"{', '.join(US_REGIONS)}")
+            wanted += region_states
+        wanted = list(dict.fromkeys(wanted))
+        if not wanted:
+            return "Please provide at least one state or a region."
+
+        url = f"{self.NWS_API_BASE}/alerts/active?area={','.join(wanted)}"
+        data = await self.make_nws_request(url)
+
+        if not data or "features" not in data:
+            return "Unable to fetch alerts or no alerts found."
+
+        unique = {}
+        for feature in data["features"]:
+            alert_id = feature.get("id") or feature["properties"].get("id")
+            unique.setdefault(alert_id, feature)
+
+        alerts = []
+        for feature in unique.values():
+            ugc = feature["properties"].get("geocode", {}).get("UGC", [])
+            affected = [state for state in wanted
+                        if any(code[:2] == state for code in ugc)]
+            if not affected:
+                marine = any(code[:2] in MARINE_PREFIXES for code in ugc)
+                affected = [MARINE_GROUP] if marine else wanted[:1]
+            alerts.append({**self.alert_data(feature), "states": affected})
+        return ToolResult({"states": wanted, "alerts": alerts},
+                          self.format_regional_alerts,
+                          trim=[("alerts", ("description", "instruction"))])
+
+    def format_regional_alerts(self, data: Dict[str, Any]) -> str:
+        by_state: Dict[str, list] = {state: [] for state in data["states"]}
+        for alert in data["alerts"]:
+            for state in alert["states"]:
+                by_state.setdefault(state, []).append(alert)
+
+        sections = []
+        for state, alerts in by_state.items():
+            if state == MARINE_GROUP:
+                sections.append("## Marine zones\n" + "\n---\n".join(
+                    self.format_alert(alert) for alert in alerts))
+                continue
+            if not alerts:
+                sections.append(f"## {state}\n" + (
+                    "No alerts shown; some alerts were omitted to fit the "
+                    "output size limit."
+                    if data.get("truncated", {}).get("dropped") else
+                    "No active alerts for this state."))
+                continue
+            lines = []
+            for alert in alerts:
+                if alert["states"][0] == state:
+                    lines.append(self.format_alert(alert))
+                else:
+                    event = alert.get("event", "Unknown")
+                    lines.append(f"\n{event} (see {alert['states'][0]})\n")
+            sections.append(f"## {state}\n" + "\n---\n".join(lines))
+
+        return "\n\n".join(sections)
+
+    @staticmethod
+    def point_key(latitude: float, longitude: float) -> str:
+        # NWS only accepts 4 decimal places and redirects anything finer, so
+        # this is also the precision the cache is keyed on.
+        return f"{round(latitude, 4)},{round(longitude, 4)}"
+
+    @staticmethod
+    def cell_key(point: Dict[str, Any]) -> str:
+        return f"{point['gridId']}/{point['gridX']},{point['gridY']}"
+
+    def cached_point(self, latitude: float,
+                     longitude: float) -> Dict[str, Any] | None:
+        """The grid point for these coordinates, if we already know it."""
+        key = self.point_key(latitude, longitude)
+        point = self.points_cache.get(key)
+        if point is not None:
+            return point
+
+        # Nearby coordinates fall in the same 2.5 km grid cell; reuse a cell
+        # we have already seen instead of asking /points again.
+        point = self.grid_index.find(round(latitude, 4), round(longitude, 4))
+        if point is not None:
+            self.points_cache.set(key, point)
+        return point
+
+    def forget_point(self, latitude: float, longitude: float,
+                     point: Dict[str, Any]) -> None:
+        """Drop a point that turned out to be stale from both caches."""
+        self.points_cache.pop(self.point_key(latitude, longitude))
+        self.grid_index.discard(self.cell_key(point))
+        self.metrics.inc("nws_points_invalidated_total")
+
+    async def resolve_point(self, latitude: float, longitude: float,
+                            refresh: bool = False) -> Dict[str, Any] | None:
+        """Resolve coordinates to their NWS grid point, using the points cache.
+
+        With ``refresh`` the caches are skipped and /points is always asked.
+        """
+        if not refresh:
+            point = self.cached_point(latitude, longitude)
+            if point is not None:
+                return point
 
+        key = self.point_key(latitude, longitude)
+        points_data = await self.make_nws_request(
+            f"{self.NWS_API_BASE}/points/{key}")
         if not points_data:
-            return "Unable to fetch forecast data for this location."
+            return None
+
+        props = points_data["properties"]
+        point = {
+            "gridId": props.get("gridId"),
+            "gridX": props.get("gridX"),
+            "gridY": props.get("gridY"),
+            "forecast": props["forecast"],
+            "forecastHourly": props.get("forecastHourly"),
+            "forecastGridData": props.get("forecastGridData")
+        }
+        self.points_cache.set(key, point)
+        return point
+
+    async def fetch_location_data(
+            self, latitude: float, longitude: float,
+            product: str = "forecast"
+    ) -> tuple[Dict[str, Any] | None, Dict[str, Any] | None]:
+        """Resolve a location's grid point and fetch one of its products.
+
+        Returns ``(point, data)``, either of which may be None. A cached
+        point whose product fails to load may be stale (the grid moved, or
+        the API base changed), so it is forgotten and /points is asked once
+        more before giving up.
+        """
+        point = self.cached_point(latitude, longitude)
+        if point is not None:
+            if not point.get(product):
+                return point, None
+            data = await self.fetch_point_data(point, product)
+            if data is not None:
+                return point, data
+            self.forget_point(latitude, longitude, point)
 
-        forecast_url = points_data["properties"]["forecast"]
-        forecast_data = await self.make_nws_request(forecast_url)
+        point = await self.resolve_point(latitude, longitude, refresh=True)
+        if not point or not point.get(product):
+            return point, None
+        return point, await self.fetch_point_data(point, product)
+
+    @coalesce
+    async def get_forecast(self, latitude: float,
+                           longitude: float) -> ToolResult | str:
+        """Get weather forecast for a location."""
+        point, forecast_data = await self.fetch_location_data(latitude,
+                                                              longitude)
+
+        if not point:
+            return "Unable to fetch forecast data for this location."
 
         if not forecast_data:
             return "Unable to fetch detailed forecast."
 
-        periods = forecast_data["properties"]["periods"]
+        return ToolResult(
+            {
+                "latitude": latitude,
+                "longitude": longitude,
+                "periods": self.forecast_periods(forecast_data)
+            }, lambda data: self.format_forecast(data["periods"]))
+
+    async def fetch_point_data(
+            self, point: Dict[str, Any],
+            product: str = "forecast") -> Dict[str, Any] | None:
+        """Fetch a gridpoint product for a resolved point.
+
+        The grid cell polygon that comes back with it is added to the
+        spatial index so later coordinates inside the cell skip /points.
+        """
+        data = await self.make_nws_request(point[product])
+        geometry = (data or {}).get("geometry") or {}
+        if geometry.get("type") == "Polygon" and geometry.get("coordinates"):
+            self.grid_index.add(self.cell_key(point),
+                                geometry["coordinates"][0], point)
+        return data
+
+    async def _daily_summary(self, latitude: float, longitude: float,
+                             days: int, product: str,
+                             label: str) -> ToolResult | str:
+        # Imported here so numpy loads on first use, not at startup.
+        from mcp_common import forecast_stats
+
+        point, data = await self.fetch_location_data(latitude, longitude,
+                                                     product)
+        if not point or not point.get(product):
+            return "Unable to fetch forecast data for this location."
+        if not data:
+            return f"Unable to fetch {label}."
+
+        days = max(1, min(int(days), 7))
+        if product == "forecastHourly":
+            summary = forecast_stats.summarize_hourly(
+                data["properties"]["periods"], days)
+        else:
+            summary = forecast_stats.summarize_gridpoints(
+                data["properties"], days)
+        if not summary:
+            return f"No {label} available for this location."
+        return ToolResult(
+            {"source": label, "days": summary},
+            lambda data: f"Daily summary from the {data['source']}:\n" +
+            forecast_stats.format_daily_summary(data["days"]))
+
+    @coalesce
+    async def get_hourly_forecast(self, latitude: float, longitude: float,
+                                  days: int = 7) -> ToolResult | str:
+        """Get daily temperature, precipitation and wind statistics from the hourly forecast."""
+        return await self._daily_summary(latitude, longitude, days,
+                                         "forecastHourly", "hourly forecast")
+
+    @coalesce
+    async def get_gridpoint_summary(self, latitude: float, longitude: float,
+                                    days: int = 7) -> ToolResult | str:
+        """Get daily statistics, including precipitation amounts, from raw gridpoint data."""
+        return await self._daily_summary(latitude, longitude, days,
+                                         "forecastGridData", "gridpoint data")
+
+    @staticmethod
+    def forecast_periods(forecast_data: dict) -> list[Dict[str, Any]]:
+        """Extract the first few forecast periods and the fields we report."""
+        return [{
+            "name": period["name"],
+            "temperature": period["temperature"],
+            "temperatureUnit": period["temperatureUnit"],
+            "windSpeed": period["windSpeed"],
+            "windDirection": period["windDirection"],
+            "detailedForecast": period["detailedForecast"]
+        } for period in forecast_data["properties"]["periods"][:5]]
+
+    def format_forecast(self, periods: list[Dict[str, Any]]) -> str:
+        """Format forecast periods into a readable string."""
         forecasts = []
-        for period in periods[:5]:
+        for period in periods:
             forecast = f"""
 {period['name']}:
 Temperature: {period['temperature']}°{period['temperatureUnit']}
@@ -76,131 +712,288 @@ Forecast: {period['detailedForecast']}
 
         return "\n---\n".join(forecasts)
 
-    async def get_weather_by_city(self, city: str) -> str:
+    @staticmethod
+    def parse_location(location: Any) -> tuple[float, float] | str:
+        """``(latitude, longitude)`` from a batch entry, or why it is invalid."""
+        if not isinstance(location, dict):
+            return "Location must be an object with latitude and longitude."
+        try:
+            values = [location[key] for key in ("latitude", "longitude")]
+        except KeyError:
+            return "Location needs both latitude and longitude."
+        try:
+            if any(isinstance(value, bool) for value in values):
+                raise TypeError
+            latitude, longitude = (float(value) for value in values)
+        except (TypeError, ValueError):
+            return "Latitude and longitude must be numbers."
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return ("Latitude must be within -90..90 and longitude within "
+                    "-180..180.")
+        return latitude, longitude
+
+    async def get_forecast_batch(self,
+                                 locations: list[dict]) -> ToolResult | str:
+        """Get forecasts for many locations at once.
+
+        Points are resolved concurrently under ``batch_concurrency``, and
+        locations that share an NWS grid cell share one forecast fetch.
+        Every location gets its own section, including invalid ones and
+        ones that failed.
+        """
+        if not isinstance(locations, list):
+            return "locations must be a list of {latitude, longitude} objects."
+        if len(locations) > self.max_batch_locations:
+            return (f"Too many locations: {len(locations)} "
+                    f"(at most {self.max_batch_locations} per batch).")
+
+        slots = asyncio.Semaphore(self.batch_concurrency)
+
+        async def limited(coro):
+            async with slots:
+                return await coro
+
+        parsed = [self.parse_location(loc) for loc in locations]
+        cached = [self.cached_point(*coords) if isinstance(coords, tuple)
+                  else None for coords in parsed]
+        missing = [coords for coords, point in zip(parsed, cached)
+                   if isinstance(coords, tuple) and point is None]
+        resolved = iter(await asyncio.gather(
+            *(limited(self.resolve_point(*coords, refresh=True))
+              for coords in missing),
+            return_exceptions=True))
+        points = [point if point is not None else
+                  next(resolved) if isinstance(coords, tuple) else None
+                  for coords, point in zip(parsed, cached)]
+
+        unique_points = list({
+            point["forecast"]: point
+            for point in points if isinstance(point, dict)
+        }.values())
+        forecast_urls = [point["forecast"] for point in unique_points]
+        fetched = await asyncio.gather(
+            *(limited(self.fetch_point_data(point)) for point in unique_points),
+            return_exceptions=True)
+        forecasts = dict(zip(forecast_urls, fetched))
+
+        # Cached points whose forecast failed may be stale; forget them and
+        # ask /points once more (see fetch_location_data).
+        stale = [i for i, point in enumerate(cached) if point is not None
+                 and not isinstance(forecasts[point["forecast"]], dict)]
+        for i in stale:
+            self.forget_point(*parsed[i], cached[i])
+        retried = await asyncio.gather(
+            *(limited(self.fetch_location_data(*parsed[i])) for i in stale),
+            return_exceptions=True)
+        for i, outcome in zip(stale, retried):
+            if isinstance(outcome, tuple) and isinstance(outcome[0], dict):
+                points[i], data = outcome
+                url = points[i]["forecast"]
+                if isinstance(data, dict) or url not in forecasts:
+                    forecasts[url] = data
+
+        results = []
+        for loc, coords, point in zip(locations, parsed, points):
+            if isinstance(coords, str):
+                result = {key: loc[key] for key in ("latitude", "longitude")
+                          if isinstance(loc, dict) and key in loc}
+                result["error"] = coords
+            else:
+                result = {"latitude": coords[0], "longitude": coords[1]}
+                if not isinstance(point, dict):
+                    result["error"] = ("Unable to fetch forecast data for "
+                                       "this location.")
+                elif not isinstance(forecasts[point["forecast"]], dict):
+                    result["error"] = "Unable to fetch detailed forecast."
+                else:
+                    result["periods"] = self.forecast_periods(
+                        forecasts[point["forecast"]])
+            results.append(result)
+
+        return ToolResult({"locations": results}, self.format_forecast_batch)
+
+    def format_forecast_batch(self, data: Dict[str, Any]) -> str:
+        sections = []
+        for number, result in enumerate(data["locations"], 1):
+            if "latitude" in result and "longitude" in result:
+                header = f"## {result['latitude']}, {result['longitude']}"
+            else:
+                header = f"## Location {number}"
+            if "error" in result:
+                body = f"Error: {result['error']}"
+            else:
+                body = self.format_forecast(result["periods"])
+            sections.append(f"{header}\n{body}")
+
+        return "\n\n".join(sections)
+
+    @coalesce
+    async def get_weather_by_city(self, city: str) -> ToolResult | str:
         """Get weather forecast for a city by name."""
-        city_coords = {
-            "new york": (40.7831, -73.9712),
-            "san francisco": (37.7749, -122.4194),
-            "los angeles": (34.0522, -118.2437),
-            "chicago": (41.8781, -87.6298),
-            "houston": (29.7604, -95.3698),
-            "miami": (25.7617, -80.1918),
-            "seattle": (47.6062, -122.3321),
-            "denver": (39.7392, -104.9903),
-            "atlanta": (33.7490, -84.3880),
-            "boston": (42.3601, -71.0589),
-            "dhaka": (23.8103, 90.4125),
-            "washington": (38.9072, -77.0369),
-            "philadelphia": (39.9526, -75.1652),
-            "phoenix": (33.4484, -112.0740),
-            "las vegas": (36.1699, -115.1398)
-        }
-        
-        city_lower = city.lower().strip()
-        
-        if city_lower in city_coords:
-            lat, lon = city_coords[city_lower]
-            return await self.get_forecast(lat, lon)
-        else:
-            return f"Sorry, I don't have coordinates for '{city}'. Available cities: {', '.join(city_coords.keys())}"
+        if not self.gazetteer.ready:
+            # Opening may build the index, which takes seconds for a large
+            # data file; lookups after that are sub-millisecond.
+            await asyncio.to_thread(self.gazetteer.open)
+        places = self.gazetteer.lookup(city, limit=1)
 
-# MCP Server implementation
-class MCPServer:
-    def __init__(self):
-        self.weather = WeatherTools()
-        self.tools = {
-            "get_forecast": {
-                "name": "get_forecast",
-                "description": "Get weather forecast for a location using latitude and longitude coordinates",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "latitude": {"type": "number", "description": "Latitude of the location"},
-                        "longitude": {"type": "number", "description": "Longitude of the location"}
-                    },
-                    "required": ["latitude", "longitude"]
-                }
+        if not places:
+            return f"Sorry, I don't have coordinates for '{city}'."
+
+        place = places[0]
+        forecast = await self.get_forecast(place.latitude, place.longitude)
+        if isinstance(forecast, str):
+            return f"Forecast for {place.label}:\n{forecast}"
+        return ToolResult(
+            {
+                "place": place.label,
+                **forecast.data
+            }, lambda data:
+            f"Forecast for {data['place']}:\n{self.format_forecast(data['periods'])}")
+
+TOOL_SCHEMAS = {
+    "get_forecast": {
+        "name": "get_forecast",
+        "description": "Get weather forecast for a location using latitude and longitude coordinates",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "latitude": {"type": "number", "description": "Latitude of the location"},
+                "longitude": {"type": "number", "description": "Longitude of the location"}
             },
-            "get_weather_by_city": {
-                "name": "get_weather_by_city",
-                "description": "Get weather forecast for a city by name (supports major US cities and Dhaka)",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "city": {"type": "string", "description": "Name of the city (e.g., 'New York', 'San Francisco', 'Dhaka')"}
-                    },
-                    "required": ["city"]
+            "required": ["latitude", "longitude"]
+        }
+    },
+    "get_forecast_batch": {
+        "name": "get_forecast_batch",
+        "description": "Get weather forecasts for many locations at once using latitude and longitude coordinates",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "locations": {
+                    "type": "array",
+                    "description": "Locations to forecast",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "latitude": {"type": "number", "description": "Latitude of the location"},
+                            "longitude": {"type": "number", "description": "Longitude of the location"}
+                        },
+                        "required": ["latitude", "longitude"]
+                    }
                 }
             },
-            "get_alerts": {
-                "name": "get_alerts",
-                "description": "Get weather alerts for a US state",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "state": {"type": "string", "description": "Two-letter US state code (e.g., 'CA', 'NY')"}
-                    },
-                    "required": ["state"]
+            "required": ["locations"]
+        }
+    },
+    "get_hourly_forecast": {
+        "name": "get_hourly_forecast",
+        "description": "Get daily min/max/mean temperature, precipitation chance and peak wind for the next days, aggregated from the hourly forecast",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "latitude": {"type": "number", "description": "Latitude of the location"},
+                "longitude": {"type": "number", "description": "Longitude of the location"},
+                "days": {"type": "integer", "description": "Number of days to summarize (1-7)", "minimum": 1, "maximum": 7, "default": 7}
+            },
+            "required": ["latitude", "longitude"]
+        }
+    },
+    "get_gridpoint_summary": {
+        "name": "get_gridpoint_summary",
+        "description": "Get daily temperature, precipitation chance and amount, and peak wind/gust statistics from raw NWS gridpoint data",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "latitude": {"type": "number", "description": "Latitude of the location"},
+                "longitude": {"type": "number", "description": "Longitude of the location"},
+                "days": {"type": "integer", "description": "Number of days to summarize (1-7)", "minimum": 1, "maximum": 7, "default": 7}
+            },
+            "required": ["latitude", "longitude"]
+        }
+    },
+    "get_weather_by_city": {
+        "name": "get_weather_by_city",
+        "description": "Get weather forecast for a city or town by name, optionally qualified with a state or country code (e.g., 'Portland, ME')",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "city": {"type": "string", "description": "Name of the city (e.g., 'New York', 'San Francisco', 'Dhaka')"}
+            },
+            "required": ["city"]
+        }
+    },
+    "get_alerts": {
+        "name": "get_alerts",
+        "description": "Get weather alerts for a US state",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "state": {"type": "string", "description": "Two-letter US state code (e.g., 'CA', 'NY')"}
+            },
+            "required": ["state"]
+        }
+    },
+    "get_regional_alerts": {
+        "name": "get_regional_alerts",
+        "description": "Get weather alerts for several US states, or a US region, in one request, grouped by state",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "states": {
+                    "type": ["array", "string"],
+                    "items": {"type": "string"},
+                    "description": "Two-letter US state codes, as a list or comma-separated (e.g., ['CA', 'NV', 'AZ'] or 'CA,NV,AZ')"
+                },
+                "region": {
+                    "type": "string",
+                    "enum": list(US_REGIONS),
+                    "description": "US Census region to fetch alerts for"
                 }
             }
         }
+    }
+}
+
+
+def register_tools(registry: ToolRegistry,
+                   weather: WeatherTools | None = None) -> WeatherTools:
+    """Register the weather tools, backed by ``weather``, with a registry."""
+    weather = weather or WeatherTools()
+    handlers = {
+        "get_forecast": lambda args: weather.get_forecast(
+            args["latitude"], args["longitude"]),
+        "get_forecast_batch": lambda args: weather.get_forecast_batch(
+            args["locations"]),
+        "get_hourly_forecast": lambda args: weather.get_hourly_forecast(
+            args["latitude"], args["longitude"], args.get("days", 7)),
+        "get_gridpoint_summary": lambda args: weather.get_gridpoint_summary(
+            args["latitude"], args["longitude"], args.get("days", 7)),
+        "get_weather_by_city": lambda args: weather.get_weather_by_city(
+            args["city"]),
+        "get_alerts": lambda args: weather.get_alerts(args["state"]),
+        "get_regional_alerts": lambda args: weather.get_regional_alerts(
+            args.get("states"), args.get("region")),
+    }
+    for name, schema in TOOL_SCHEMAS.items():
+        registry.add(schema, handlers[name])
+    registry.on_warm_up(weather.warm_up)
+    registry.on_close(weather.aclose)
+    registry.on_collect(weather.collect_metrics)
+    return weather
+
+
+# MCP Server implementation
+class MCPServer(MCPHost):
+    """Serves only the weather tools; see mcp_host.py for all tools at once."""
+
+    def __init__(self):
+        registry = ToolRegistry()
+        self.weather = register_tools(registry)
+        super().__init__(registry, "weather-server")
 
-    async def handle_request(self, request):
-        method = request.get("method")
-        params = request.get("params", {})
-        
-        if method == "tools/list":
-            return {"tools": list(self.tools.values())}
-        
-        elif method == "tools/call":
-            tool_name = params.get("name")
-            arguments = params.get("arguments", {})
-            
-            if tool_name == "get_forecast":
-                result = await self.weather.get_forecast(arguments["latitude"], arguments["longitude"])
-            elif tool_name == "get_weather_by_city":
-                result = await self.weather.get_weather_by_city(arguments["city"])
-            elif tool_name == "get_alerts":
-                result = await self.weather.get_alerts(arguments["state"])
-            else:
-                return {"error": {"code": -32601, "message": f"Unknown tool: {tool_name}"}}
-            
-            return {"content": [{"type": "text", "text": result}]}
-        
-        else:
-            return {"error": {"code": -32601, "message": f"Unknown method: {method}"}}
 
 async def main():
-    server = MCPServer()
-    
-    while True:
-        try:
-            line = input()
-            if not line.strip():
-                continue
-                
-            request = json.loads(line)
-            result = await server.handle_request(request)
-            
-            response = {
-                "jsonrpc": "2.0",
-                "id": request.get("id"),
-                "result": result
-            }
-            
-            print(json.dumps(response))
-            sys.stdout.flush()
-            
-        except EOFError:
-            break
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": request.get("id") if 'request' in locals() else None,
-                "error": {"code": -32000, "message": str(e)}
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+    await serve(MCPServer())
 
 if __name__ == "__main__":
     asyncio.run(main())